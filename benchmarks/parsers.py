@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES = BENCH_DIR / "fixtures"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+os.environ.setdefault("ADZUNA_APP_ID", "bench")
+os.environ.setdefault("ADZUNA_APP_KEY", "bench")
+os.environ.setdefault("FRANCE_TRAVAIL_CLIENT_ID", "bench")
+os.environ.setdefault("FRANCE_TRAVAIL_CLIENT_SECRET", "bench")
+
+FIELDS = ["id", "url", "title", "company", "location", "posted_at"]
+
+
+def _read(path: str) -> str:
+    return (FIXTURES / path).read_text(encoding="utf-8")
+
+
+def _one_page(payload):
+    served = []
+
+    def fetch(*args, **kwargs):
+        if served:
+            return type(payload)()
+        served.append(True)
+        return payload
+    return fetch
+
+
+def _francetravail_html(max_results):
+    from scrapers.francetravail import FranceTravailScraper, SearchCriteria
+    scraper = FranceTravailScraper()
+    scraper.delay = 0
+    scraper._fetch_page = _one_page(_read("francetravail/search.html"))
+    return scraper.search(SearchCriteria(keywords=["controle"], max_results=max_results))
+
+
+def _francetravail_api(max_results):
+    from scrapers.francetravail import FranceTravailAPIScraper, SearchCriteria
+    scraper = FranceTravailAPIScraper()
+    scraper._fetch_range = _one_page(json.loads(_read("francetravail/api.json"))["resultats"])
+    return scraper.search(SearchCriteria(keywords=["controle"], max_results=max_results))
+
+
+_francetravail_server = None
+
+
+def _francetravail_stub(max_results):
+    # Runs the real HTTP path (token, 401 retry, range paging, postcode lookup) against a local stub.
+    global _francetravail_server
+    from scrapers.francetravail import FranceTravailAPIScraper, SearchCriteria
+    from stubs import StubFranceTravailServer
+
+    if _francetravail_server is None:
+        offers = json.loads(_read("francetravail/api.json"))["resultats"]
+        communes = [{"code": "75101", "libelle": "PARIS 01", "codePostal": "75001", "codeDepartement": "75"}]
+        _francetravail_server = StubFranceTravailServer(offers, communes).__enter__()
+        os.environ["FRANCE_TRAVAIL_API_URL"] = f"{_francetravail_server.url}/partenaire/offresdemploi/v2"
+        os.environ["FRANCE_TRAVAIL_TOKEN_URL"] = f"{_francetravail_server.url}/connexion/oauth2/access_token"
+
+    scraper = FranceTravailAPIScraper()
+    scraper.MAX_RANGE = 10
+    return scraper.search(SearchCriteria(keywords=["controle"], location="75001", radius_km=10,
+                                         max_results=max_results))
+
+
+def _hellowork_html(max_results):
+    from scrapers.hellowork import HelloWorkScraper, SearchCriteria
+    scraper = HelloWorkScraper()
+    scraper.delay = 0
+    scraper._fetch_page = _one_page(_read("hellowork/search.html"))
+    return scraper.search(SearchCriteria(keywords=["controle"], max_results=max_results))
+
+
+def _linkedin(fixture, guest_api):
+    def run(max_results):
+        from scrapers.linkedin import LinkedInScraper, SearchCriteria
+        scraper = LinkedInScraper()
+        scraper.delay = 0
+        scraper.use_guest_api = guest_api
+        scraper._fetch_page = _one_page(_read(fixture))
+        return scraper.search(SearchCriteria(keywords=["controle"], max_results=max_results))
+    return run
+
+
+def _wttj_algolia(max_results):
+    from scrapers.wttj import WTTJScraper, SearchCriteria
+    scraper = WTTJScraper()
+    scraper._fetch_algolia = _one_page(json.loads(_read("wttj/algolia.json"))["results"])
+    return scraper.search(SearchCriteria(keywords=["controle"], max_results=max_results))
+
+
+def _adzuna_api(max_results):
+    from scrapers.adzuna import AdzunaScraper, SearchCriteria
+    scraper = AdzunaScraper()
+    scraper._fetch_page = _one_page(json.loads(_read("adzuna/search.json")))
+    return scraper.search(SearchCriteria(keywords=["controle"], max_results=max_results))
+
+
+CASES = {
+    "francetravail_html": _francetravail_html,
+    "francetravail_api": _francetravail_api,
+    "francetravail_stub": _francetravail_stub,
+    "hellowork_html": _hellowork_html,
+    "linkedin_html": _linkedin("linkedin/search.html", guest_api=False),
+    "linkedin_fragment": _linkedin("linkedin/fragment.html", guest_api=True),
+    "wttj_algolia": _wttj_algolia,
+    "adzuna_api": _adzuna_api,
+}
+
+
+def _as_row(job) -> dict:
+    row = {f: getattr(job, f) for f in FIELDS}
+    row["posted_at"] = row["posted_at"].isoformat() if row["posted_at"] else None
+    return row
+
+
+def check_fields(name: str, expected: list[dict]) -> list[str]:
+    jobs = [_as_row(job) for job in CASES[name](len(expected))]
+    errors = []
+    if len(jobs) != len(expected):
+        errors.append(f"expected {len(expected)} offers, got {len(jobs)}")
+    for i, (got, want) in enumerate(zip(jobs, expected)):
+        for f in FIELDS:
+            if got[f] != want[f]:
+                errors.append(f"offer {i} {f}: {got[f]!r} != {want[f]!r}")
+    return errors
+
+
+def measure(name: str, cards: int, repeat: int) -> dict:
+    run = CASES[name]
+    list(run(cards))
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in run(cards))
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    tracemalloc.start()
+    list(run(cards))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cards_per_sec": round(count / best, 1) if best else 0.0,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper parser benchmark")
+    parser.add_argument("cases", nargs="*", help="Subset of cases to run")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--tolerance", type=float, default=0.35,
+                        help="Allowed relative slowdown / memory growth before flagging a regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    expected = json.loads(_read("expected.json"))
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    names = args.cases or list(CASES)
+    results = {}
+    failed = False
+
+    print(f"{'case':<20} {'cards/s':>10} {'base':>10} {'peak KiB':>9} {'base':>9}  status")
+    for name in names:
+        errors = check_fields(name, expected[name])
+        stats = measure(name, len(expected[name]), args.repeat)
+        results[name] = stats
+
+        base = baseline.get(name, {})
+        status = []
+        if errors:
+            status.append(f"FIELDS ({len(errors)})")
+        if base and stats["cards_per_sec"] < base["cards_per_sec"] * (1 - args.tolerance):
+            status.append("SLOWER")
+        if base and stats["peak_kib"] > base["peak_kib"] * (1 + args.tolerance):
+            status.append("MEMORY")
+        failed |= bool(status)
+
+        print(f"{name:<20} {stats['cards_per_sec']:>10} {base.get('cards_per_sec', '-'):>10} "
+              f"{stats['peak_kib']:>9} {base.get('peak_kib', '-'):>9}  {', '.join(status) or 'ok'}")
+        for error in errors[:5]:
+            print(f"    {error}")
+
+    if args.update_baseline:
+        baseline.update(results)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nBaseline written to {BASELINE_FILE}")
+        return 0
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import functools
+import statistics
+from pathlib import Path
+from collections import defaultdict
+
+BENCH_DIR = Path(__file__).resolve().parent
+POSTINGS_DIR = BENCH_DIR / "fixtures" / "postings"
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+from stubs import StubLLMServer  # noqa: E402
+from handlers import ai_handler  # noqa: E402
+
+CV_HEADER = "Étudiant en Finance, disponible à partir de Février pour un stage de 6 mois"
+
+STAGES = [
+    ("job_processor", "detect_language"),
+    ("job_processor", "get_cover_letter_label"),
+    ("job_processor", "get_company_name"),
+    ("job_processor", "get_position_title"),
+    ("job_processor", "get_job_location"),
+    ("job_processor", "get_cv_updates"),
+    ("job_processor", "build_cover_letter_paragraphs"),
+    ("job_processor", "modify_cover_letter"),
+    ("job_processor", "modify_cv_header"),
+    ("job_processor", "convert_to_pdf"),
+    ("job_processor", "generate_email_body"),
+    ("job_processor", "get_email_subject"),
+    ("job_processor", "create_eml_file"),
+]
+
+
+def build_templates(directory: Path) -> tuple[Path, Path]:
+    from docx import Document
+
+    cl = Document()
+    for text in [
+        "Camille Martin", "12 rue des Lilas, 69003 Lyon", "camille.martin@example.com - +33 6 12 34 56 78", "",
+        "Entreprise", "Service Recrutement", "Ville", "", "Lyon, le 1er janvier 2026", "",
+        "Objet : Candidature au poste de Contrôleur de gestion", "",
+        "Madame, Monsieur,",
+        "Actuellement en Master Finance, je souhaite rejoindre votre équipe en tant que Contrôleur de gestion.",
+        "Lors de mon stage chez Banque Rhône, j'ai préparé le reporting mensuel et participé au budget.",
+        "Votre entreprise m'attire par la qualité de ses projets et son ancrage régional.",
+        "Je serais heureuse de vous présenter ma motivation lors d'un entretien.",
+        "Je vous prie d'agréer, Madame, Monsieur, mes salutations distinguées.", "", "Camille Martin",
+    ]:
+        cl.add_paragraph(text)
+    cl_path = directory / "template_cover_letter.docx"
+    cl.save(cl_path)
+
+    cv = Document()
+    table = cv.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Camille Martin"
+    table.cell(0, 1).text = CV_HEADER
+    for section in ["Expérience", "Formation", "Compétences"]:
+        cv.add_heading(section, level=2)
+        for i in range(6):
+            cv.add_paragraph(f"{section} ligne {i} - " + "détail " * 12)
+    cv_path = directory / "template_cv.docx"
+    cv.save(cv_path)
+    return cv_path, cl_path
+
+
+def load_corpus(size: int) -> dict[str, str]:
+    postings = [p.read_text(encoding="utf-8") for p in sorted(POSTINGS_DIR.glob("*.txt"))]
+    return {f"https://jobs.example.com/offer/{i}": postings[i % len(postings)] for i in range(size)}
+
+
+def timed(stage: str, func, samples: dict):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            samples[stage].append(time.perf_counter() - start)
+    return wrapper
+
+
+def stub_pdf(latency: float):
+    def convert(docx_path: Path, pdf_path: Path):
+        if latency:
+            time.sleep(latency)
+        shutil.copyfile(docx_path, pdf_path)
+    return convert
+
+
+def run_once(corpus: dict, workers: int, args, workdir: Path) -> tuple[dict, float]:
+    import main as main_module
+    import job_processor
+    from handlers.csv_handler import add_csv_entries
+
+    output = workdir / f"output-{workers}"
+    output.mkdir()
+    os.environ["OUTPUT_BASE_DIR"] = str(output)
+    os.environ["TRACKER_FILE"] = str(workdir / f"list-{workers}.csv")
+    add_csv_entries(list(corpus))
+
+    samples = defaultdict(list)
+    originals = []
+
+    def patch(module, attr, value):
+        originals.append((module, attr, getattr(module, attr)))
+        setattr(module, attr, value)
+
+    def fetch(url: str) -> str:
+        if args.fetch_latency:
+            time.sleep(args.fetch_latency)
+        return corpus.get(url)
+
+    modules = {"job_processor": job_processor}
+    if args.stub_pdf:
+        patch(job_processor, "convert_to_pdf", stub_pdf(args.pdf_latency))
+    for module_name, attr in STAGES:
+        module = modules[module_name]
+        if hasattr(module, attr):
+            patch(module, attr, timed(attr, getattr(module, attr), samples))
+    patch(main_module, "fetch_job_posting_from_url", timed("fetch", fetch, samples))
+    patch(main_module, "process_url", timed("total", main_module.process_url, samples))
+
+    stdout = sys.stdout
+    start = time.perf_counter()
+    try:
+        sys.stdout = open(os.devnull, "w")
+        main_module.main(workers=workers, interactive=False)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+        for module, attr, value in reversed(originals):
+            setattr(module, attr, value)
+    return samples, time.perf_counter() - start
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def report(samples: dict, elapsed: float, postings: int, workers: int):
+    print(f"\nworkers={workers}  postings={postings}  wall={elapsed:.2f}s  throughput={postings / elapsed:.2f} postings/s")
+    print(f"  {'stage':<34} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    order = ["fetch"] + [attr for _, attr in STAGES] + ["total"]
+    for stage in order:
+        values = samples.get(stage)
+        if not values:
+            continue
+        print(f"  {stage:<34} {len(values):>4} {percentile(values, 50) * 1000:>9.1f} "
+              f"{percentile(values, 95) * 1000:>9.1f} {max(values) * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark against local stubs")
+    parser.add_argument("--postings", type=int, default=8)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per stub LLM response")
+    parser.add_argument("--fetch-latency", type=float, default=0.5, help="Seconds per stub web_fetch")
+    parser.add_argument("--pdf-latency", type=float, default=1.0, help="Seconds per stub PDF conversion")
+    parser.add_argument("--real-pdf", dest="stub_pdf", action="store_false",
+                        help="Use LibreOffice instead of the stub converter")
+    parser.add_argument("--batch", action="store_true", help="Run with BATCH_MODE=1 against the stub batch API")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated output directory")
+    args = parser.parse_args()
+
+    if not args.stub_pdf and not shutil.which("libreoffice"):
+        parser.error("--real-pdf requires libreoffice on PATH")
+
+    corpus = load_corpus(args.postings)
+    workdir = Path(tempfile.mkdtemp(prefix="pipeline-bench-"))
+    cv_path, cl_path = build_templates(workdir)
+
+    with StubLLMServer(latency=args.llm_latency, batch_delay=args.llm_latency) as llm:
+        os.environ.update({
+            "BATCH_MODE": "1" if args.batch else "0",
+            "BATCH_POLL_SECONDS": str(max(args.llm_latency, 0.05)),
+            "AI_ENDPOINT": llm.url,
+            "OPENAI_API_KEY": "bench",
+            "TEMPLATE_CV": str(cv_path),
+            "TEMPLATE_COVER_LETTER": str(cl_path),
+            "CV_HEADER_TEMPLATE": CV_HEADER,
+        })
+        for workers in [int(w) for w in args.workers.split(",")]:
+            samples, elapsed = run_once(corpus, workers, args, workdir)
+            report(samples, elapsed, len(corpus), workers)
+        print(f"\nLLM requests served: {len(llm.requests)}")
+        usage = ai_handler.get_usage()
+        if usage["prompt_tokens"]:
+            print(f"Prompt tokens: {usage['prompt_tokens']}, cached: {usage['cached_tokens']} "
+                  f"({usage['cached_tokens'] / usage['prompt_tokens']:.0%}), completion tokens: {usage['completion_tokens']}")
+
+    if args.keep:
+        print(f"Output kept in {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
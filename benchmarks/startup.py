@@ -0,0 +1,67 @@
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+
+HEAVY_MODULES = ["openai", "docx", "ollama", "requests", "bs4", "lxml", "httpx", "pydantic", "numpy"]
+ENTRY_POINTS = ["main", "search"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> dict[str, int]:
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+            if match.group(4) == "site":
+                cumulative.clear()
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard CLI cold-start imports with -X importtime")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Maximum median cumulative import time of each entry point")
+    args = parser.parse_args()
+
+    failed = False
+    for entry in ENTRY_POINTS:
+        runs = [import_profile(entry) for _ in range(args.runs)]
+        total_ms = statistics.median(r.get(entry, 0) for r in runs) / 1000
+        loaded = runs[-1]
+        heavy = [m for m in HEAVY_MODULES if m in loaded]
+        slowest = sorted(
+            ((name, us) for name, us in loaded.items() if name != entry and "." not in name),
+            key=lambda item: item[1], reverse=True,
+        )[:5]
+
+        status = []
+        if heavy:
+            status.append(f"heavy imports: {', '.join(heavy)}")
+        if total_ms > args.budget_ms:
+            status.append(f"over budget ({args.budget_ms:.0f} ms)")
+        failed |= bool(status)
+
+        print(f"import {entry}: {total_ms:.1f} ms  {'; '.join(status) or 'ok'}")
+        for name, us in slowest:
+            print(f"    {name:<24} {us / 1000:>7.1f} ms")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
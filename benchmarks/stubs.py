@@ -0,0 +1,287 @@
+import os
+import re
+import json
+import time
+import threading
+from email.parser import BytesParser
+from email.policy import default
+from urllib.parse import parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _canned_reply(system: str, user: str) -> str:
+    text = f"{system}\n{user}"
+
+    if "ISO 639-1" in text:
+        return "fr"
+    if "translation of 'Cover Letter'" in text:
+        return "Lettre de motivation"
+    if "hiring company name" in text:
+        match = re.search(r"^(?:Entreprise|Company)\s*:\s*(.+)$", user, re.MULTILINE)
+        return match.group(1).strip() if match else "Unknown"
+    if "job position/title" in text:
+        return user.strip().splitlines()[0]
+    if "job location" in text:
+        match = re.search(r"^(?:Lieu|Location)\s*:\s*(.+)$", user, re.MULTILINE)
+        return match.group(1).strip() if match else "Not specified"
+    if "CV header updates" in text:
+        return json.dumps({"job_field": "Finance", "start_date": "Mars"})
+    if "CV HEADER TEXT" in text:
+        return json.dumps({"job_field": "Finance", "start_date": "Février"}, ensure_ascii=False)
+    if "COVER LETTER TEMPLATE" in text:
+        paragraphs = re.findall(r'^(\d+): "(.*)"$', user, re.MULTILINE)
+        title = re.search(r"poste de (.+)$", next((p for _, p in paragraphs if p.startswith("Objet")), ""))
+        return json.dumps({
+            "company_block": [int(i) for i, p in paragraphs if p in ("Entreprise", "Service Recrutement", "Ville")],
+            "date": next((int(i) for i, p in paragraphs if re.match(r"^\w+, le ", p)), None),
+            "job_title": title.group(1) if title else "",
+            "job_title_paragraphs": [int(i) for i, p in paragraphs if title and title.group(1) in p][:2],
+            "tailored": next((int(i) for i, p in paragraphs if "m'attire" in p), None),
+        }, ensure_ascii=False)
+    if "adapt a cover letter template" in text:
+        company = re.search(r"^COMPANY: (.*)$", user, re.MULTILINE)
+        lines = len(re.findall(r"<- COMPANY BLOCK$", system, re.MULTILINE))
+        posting = user.split("JOB POSTING:", 1)[-1].strip().splitlines()
+        return json.dumps({
+            "company_block": ([company.group(1) if company else "Entreprise", "Service Recrutement", "Lyon"] + [""] * lines)[:lines],
+            "date": "Lyon, le 19 octobre 2026",
+            "job_title": posting[0] if posting else "",
+            "tailored": "Votre entreprise m'attire par la qualité de ses projets et la place qu'elle donne à la finance.",
+        }, ensure_ascii=False)
+    if "JSON array of paragraph texts" in text:
+        return json.dumps(re.findall(r'^\d+: "(.*)"$', text, re.MULTILINE), ensure_ascii=False)
+    if "email subject template" in text:
+        return "Candidature - {position} - {field} - Camille Martin"
+    if "email body template" in text:
+        return ("Madame, Monsieur,\n\nJe vous adresse ma candidature au poste de {position} chez {company}.\n\n"
+                "Vous trouverez ci-joint mon CV et ma lettre de motivation.\n\nCordialement,")
+    if "email subject" in text:
+        return "Candidature - Poste - Finance - Camille Martin"
+    if "email body" in text:
+        return ("Madame, Monsieur,\n\nJe vous adresse ma candidature pour ce poste.\n\n"
+                "Vous trouverez ci-joint mon CV et ma lettre de motivation.\n\nCordialement,")
+    return "ok"
+
+
+class StubLLMServer:
+    def __init__(self, latency: float = 0.0, reply=_canned_reply, batch_delay: float = 0.0):
+        self.latency = latency
+        self.reply = reply
+        self.batch_delay = batch_delay
+        self.requests = []
+        self.files = {}
+        self.batches = {}
+        self._prompts = []
+        self._prefix_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path.endswith("/files"):
+                    return self._send_json(200, stub._store_file(self.headers, raw))
+                body = json.loads(raw or b"{}")
+                if self.path.endswith("/batches"):
+                    return self._send_json(200, stub._create_batch(body))
+                if not self.path.endswith("/chat/completions"):
+                    return self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+                stub.requests.append(body)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self._send_json(200, stub._complete(body))
+
+            def do_GET(self):
+                parts = self.path.rstrip("/").split("/")
+                if len(parts) >= 2 and parts[-2] == "batches" and parts[-1] in stub.batches:
+                    return self._send_json(200, stub._batch_status(parts[-1]))
+                if parts[-1] == "content" and parts[-2] in stub.files:
+                    data = stub.files[parts[-2]]
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+                self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        return Handler
+
+    def _complete(self, body: dict) -> dict:
+        messages = body.get("messages", [])
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = "\n".join(m["content"] for m in messages if m["role"] == "user")
+        content = self.reply(system, user)
+        prompt = f"{system}\n{user}"
+        prompt_tokens = len(prompt) // 4
+        cached_tokens = self._cached_prefix(prompt) // 4
+        return {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4,
+                      "prompt_tokens_details": {"cached_tokens": cached_tokens}},
+        }
+
+    def _cached_prefix(self, prompt: str) -> int:
+        # Mimics a prefix cache: the longest prefix shared with an earlier prompt is "cached".
+        with self._prefix_lock:
+            best = 0
+            for previous in self._prompts:
+                shared = len(os.path.commonprefix([previous, prompt]))
+                best = max(best, shared)
+            self._prompts.append(prompt)
+        return best
+
+    def _store_file(self, headers, raw: bytes) -> dict:
+        message = BytesParser(policy=default).parsebytes(
+            f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode() + raw
+        )
+        data = next(part.get_payload(decode=True) for part in message.iter_parts() if part.get_filename())
+        file_id = f"file-{len(self.files) + 1}"
+        self.files[file_id] = data
+        return {"id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+                "filename": "batch_input.jsonl", "purpose": "batch", "status": "processed"}
+
+    def _create_batch(self, body: dict) -> dict:
+        batch_id = f"batch-{len(self.batches) + 1}"
+        lines = [json.loads(line) for line in self.files[body["input_file_id"]].splitlines() if line.strip()]
+        self.batches[batch_id] = {"body": body, "lines": lines, "created": time.time(), "output_file_id": None}
+        return self._batch_status(batch_id)
+
+    def _batch_status(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        done = time.time() - batch["created"] >= self.batch_delay
+        if done and not batch["output_file_id"]:
+            output = []
+            for line in batch["lines"]:
+                self.requests.append(line["body"])
+                output.append(json.dumps({"id": f"resp-{len(self.requests)}", "custom_id": line["custom_id"],
+                                          "response": {"status_code": 200, "body": self._complete(line["body"])},
+                                          "error": None}))
+            batch["output_file_id"] = f"file-{len(self.files) + 1}"
+            self.files[batch["output_file_id"]] = "\n".join(output).encode("utf-8")
+
+        total = len(batch["lines"])
+        return {
+            "id": batch_id, "object": "batch", "endpoint": batch["body"]["endpoint"],
+            "input_file_id": batch["body"]["input_file_id"],
+            "completion_window": batch["body"]["completion_window"],
+            "status": "completed" if done else "in_progress",
+            "output_file_id": batch["output_file_id"], "error_file_id": None,
+            "created_at": int(batch["created"]),
+            "request_counts": {"total": total, "completed": total if done else 0, "failed": 0},
+        }
+
+
+class StubFranceTravailServer:
+    # Token endpoint, paged /offres/search and communes referential of the France Travail API.
+    def __init__(self, offers: list[dict], communes: list[dict], expire_first_token: bool = True):
+        self.offers = offers
+        self.communes = communes
+        self.expire_first_token = expire_first_token
+        self.tokens = 0
+        self.requests = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, payload, headers: dict = None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not self.path.split("?", 1)[0].endswith("/access_token"):
+                    return self._send_json(404, {"error": "not found"})
+                stub.tokens += 1
+                self._send_json(200, {"access_token": f"token-{stub.tokens}", "token_type": "Bearer",
+                                      "expires_in": 1499})
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                params = dict(parse_qsl(query))
+                stub.requests.append((path, params))
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                # The first token is reported expired, as the API does once a token times out.
+                if not token.startswith("token-") or (stub.expire_first_token and token == "token-1"):
+                    return self._send_json(401, {"message": "invalid token"})
+
+                if path.endswith("/referentiel/communes"):
+                    return self._send_json(200, stub.communes)
+                if not path.endswith("/offres/search"):
+                    return self._send_json(404, {"message": "not found"})
+                if "commune" in params and params["commune"] not in {c["code"] for c in stub.communes}:
+                    return self._send_json(400, {"message": f"unknown commune {params['commune']}"})
+
+                first, last = (int(n) for n in params.get("range", "0-149").split("-"))
+                page = stub.offers[first:last + 1]
+                if not page:
+                    self.send_response(204)
+                    self.end_headers()
+                    return
+                end = first + len(page) - 1
+                status = 206 if end < len(stub.offers) - 1 else 200
+                self._send_json(status, {"resultats": page},
+                                {"Content-Range": f"offres {first}-{end}/{len(stub.offers)}"})
+
+        return Handler
@@ -0,0 +1,260 @@
+import os
+import json
+import queue
+import signal
+import shutil
+import secrets
+import threading
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from handlers.cache import atomic_write, get_cache_dir, text_hash
+from handlers.csv_handler import add_csv_entries, build_url_index, read_csv_entries, update_csv_entry
+from handlers.url_utils import url_key
+from job_processor import KNOWN_FIELDS, process_job_posting
+from main import process_url
+
+MAX_BODY_BYTES = 1 << 20
+ACTIVE_STATUSES = ("queued", "running")
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".eml": "message/rfc822",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, maxsize: int):
+        self.directory = get_cache_dir() / "jobs"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.maxsize = maxsize
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.tracker_lock = threading.Lock()
+        self.jobs = {}
+        self.by_key = {}
+        self.done_entries = {}
+        self._load()
+
+    def _load(self):
+        # Postings already processed outside the API (batch run, daemon) are not redone;
+        # their tracker rows stand in for the result.
+        for key, entry in build_url_index(read_csv_entries()).items():
+            if (entry.get("status") or "").lower() == "done":
+                self.done_entries[key] = {k: v for k, v in entry.items() if k and k != "url" and v}
+
+        jobs = []
+        for path in self.directory.glob("*.json"):
+            try:
+                jobs.append(json.loads(path.read_text(encoding="utf-8")))
+            except json.JSONDecodeError:
+                continue
+        for job in sorted(jobs, key=lambda j: j["created_at"]):
+            self.jobs[job["id"]] = job
+            if job["status"] != "failed":
+                self.by_key[job["key"]] = job["id"]
+            if job["status"] in ACTIVE_STATUSES:
+                job["status"] = "queued"
+                self.queue.put(job["id"])
+        if self.queue.qsize():
+            print(f"Re-queued {self.queue.qsize()} unfinished job(s)")
+
+    def _save(self, job: dict):
+        atomic_write(self.directory / f"{job['id']}.json", json.dumps(job, ensure_ascii=False).encode("utf-8"))
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def submit(self, payload: dict) -> tuple[dict, bool]:
+        url = (payload.get("url") or "").strip()
+        text = (payload.get("text") or "").strip()
+        if not url and not text:
+            raise ValueError("Provide a posting 'url' or its 'text'")
+        if url and not url.startswith(("http://", "https://")):
+            raise ValueError("'url' must be an http(s) URL")
+
+        key = url_key(url) if url else text_hash(text)[:24]
+        with self.lock:
+            existing = self.by_key.get(key)
+            if existing:
+                return self.jobs[existing], False
+
+            tracked = self.done_entries.get(key) if url else None
+            if not tracked and self.queue.qsize() >= self.maxsize:
+                raise QueueFull()
+
+            job = {
+                "id": secrets.token_hex(8),
+                "key": key,
+                "url": url,
+                "text": text if not url else "",
+                "known": {field: str(payload[field]) for field in KNOWN_FIELDS if payload.get(field)},
+                "status": "done" if tracked else "queued",
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "result": tracked or {},
+                "artifacts": [],
+                "error": "",
+            }
+            self.jobs[job["id"]] = job
+            self.by_key[key] = job["id"]
+            self._save(job)
+            if not tracked:
+                self.queue.put(job["id"])
+        return job, not tracked
+
+    def get(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    def _update(self, job: dict, **changes):
+        with self.lock:
+            job.update(changes)
+            if job["status"] == "failed":
+                self.by_key.pop(job["key"], None)
+            self._save(job)
+
+    def run_job(self, job: dict):
+        self._update(job, status="running", started_at=datetime.now().isoformat(timespec="seconds"))
+        try:
+            if job["url"]:
+                metadata = process_url(job["url"], "", job["known"])
+                with self.tracker_lock:
+                    add_csv_entries([{"url": job["url"], **job["known"]}])
+                    if metadata:
+                        update_csv_entry(job["url"], metadata)
+            else:
+                metadata = process_job_posting(job["text"], known=job["known"])
+        except Exception as e:
+            self._update(job, status="failed", error=str(e))
+            print(f"Job {job['id']} failed: {e}")
+            return
+
+        metadata = metadata or {}
+        artifacts = metadata.pop("artifacts", [])
+        metadata.pop("eml_path", None)
+        status = "done" if metadata.get("status") == "done" else "failed"
+        self._update(job, status=status, result=metadata, artifacts=artifacts,
+                     error="" if status == "done" else metadata.get("status", "processing failed"),
+                     finished_at=datetime.now().isoformat(timespec="seconds"))
+        if status == "done" and job["url"]:
+            with self.lock:
+                self.done_entries[job["key"]] = metadata
+
+    def worker(self):
+        while True:
+            job_id = self.queue.get()
+            if job_id is None:
+                return
+            self.run_job(self.jobs[job_id])
+
+
+def public_job(job: dict) -> dict:
+    view = {k: v for k, v in job.items() if k not in ("key", "text", "artifacts")}
+    view["artifacts"] = [f"/jobs/{job['id']}/artifacts/{quote(Path(p).name)}" for p in job["artifacts"]]
+    return view
+
+
+def make_handler(jobs: JobQueue):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict, headers: dict = None):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._send_json(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                return self._send_json(400, {"error": "invalid Content-Length"})
+            if length > MAX_BODY_BYTES:
+                return self._send_json(413, {"error": "request body too large"})
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                job, created = jobs.submit(payload if isinstance(payload, dict) else {})
+            except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+                return self._send_json(400, {"error": str(e) or "invalid JSON"})
+            except QueueFull:
+                return self._send_json(429, {"error": "queue is full", "queued": jobs.depth()},
+                                       {"Retry-After": "30"})
+            self._send_json(202 if created else 200, public_job(job), {"Location": f"/jobs/{job['id']}"})
+
+        def do_GET(self):
+            parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+            if parts == ["health"]:
+                return self._send_json(200, {"status": "ok", "queued": jobs.depth(), "capacity": jobs.maxsize})
+            job = jobs.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+            if not job:
+                return self._send_json(404, {"error": "not found"})
+            if len(parts) == 2:
+                return self._send_json(200, public_job(job))
+            if len(parts) == 4 and parts[2] == "artifacts":
+                return self._send_artifact(job, parts[3])
+            self._send_json(404, {"error": "not found"})
+
+        def _send_artifact(self, job: dict, name: str):
+            path = next((Path(p) for p in job["artifacts"] if Path(p).name == unquote(name)), None)
+            if not path or not path.exists():
+                return self._send_json(404, {"error": "artifact not found"})
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPES.get(path.suffix, "application/octet-stream"))
+            self.send_header("Content-Length", str(path.stat().st_size))
+            self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{name}")
+            self.end_headers()
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+
+    return Handler
+
+
+def run(workers: int = None):
+    workers = max(1, workers or int(os.getenv("WORKERS", "1")))
+    jobs = JobQueue(int(os.getenv("API_QUEUE_SIZE", "100")))
+    threads = [threading.Thread(target=jobs.worker, name=f"job-{i}") for i in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    host, port = os.getenv("API_HOST", "127.0.0.1"), int(os.getenv("API_PORT", "8765"))
+    server = ThreadingHTTPServer((host, port), make_handler(jobs))
+    server.daemon_threads = True
+
+    def stop(signum=None, frame=None):
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Listening on http://{host}:{port} with {workers} worker(s)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        print("Stopping after running jobs (queued jobs are kept for the next start)...")
+        while True:
+            try:
+                jobs.queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in threads:
+            jobs.queue.put(None)
+        for thread in threads:
+            thread.join()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,46 @@
+import io
+import sys
+import csv
+import argparse
+from pathlib import Path
+
+import requests
+
+from handlers.cache import atomic_write
+from handlers.geo import GAZETTEER_FILE
+
+COMMUNES_URL = "https://geo.api.gouv.fr/communes"
+FIELDS = "nom,codesPostaux,codeDepartement,centre,population"
+
+
+def fetch_communes() -> list[dict]:
+    response = requests.get(COMMUNES_URL, params={"fields": FIELDS, "format": "json"}, timeout=120)
+    response.raise_for_status()
+    return response.json()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the offline gazetteer from every French commune")
+    parser.add_argument("--output", default=str(GAZETTEER_FILE))
+    args = parser.parse_args(argv)
+
+    communes = [c for c in fetch_communes() if c.get("centre") and c.get("codeDepartement")]
+    # Metropolitan France first, then most populated first: on homonyms ("Saint-Denis")
+    # with no department or nearby search to tell them apart, the lookup keeps the first row.
+    communes.sort(key=lambda c: (c["codeDepartement"].startswith("97"), -(c.get("population") or 0)))
+
+    lines = [["name", "postcodes", "department", "lat", "lon"]]
+    for commune in communes:
+        lon, lat = commune["centre"]["coordinates"]
+        lines.append([commune["nom"], " ".join(commune.get("codesPostaux", [])), commune["codeDepartement"],
+                      f"{lat:.4f}", f"{lon:.4f}"])
+
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(lines)
+    atomic_write(Path(args.output), buffer.getvalue().encode("utf-8"))
+    print(f"Wrote {len(communes)} communes to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import signal
+import threading
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from handlers.cache import atomic_write, get_cache_dir
+from handlers.csv_handler import add_csv_entries, get_tracker_file, pending_entries, read_csv_entries, update_csv_entry
+from handlers.url_utils import url_key
+from handlers.watcher import Watcher
+from main import export_drafts, process_url
+
+HEARTBEAT_SECONDS = 10
+SETTLE_SECONDS = 2
+
+
+def get_status_file() -> Path:
+    return Path(os.getenv("STATUS_FILE") or get_cache_dir() / "daemon_status.json")
+
+
+def import_drop_dir(drop_dir: Path) -> int:
+    imported_dir = drop_dir / "imported"
+    urls = []
+    for path in sorted(drop_dir.iterdir()):
+        if not path.is_file() or path.name.startswith(".") or path.suffix not in (".txt", ".url", ".urls"):
+            continue
+        # A file still being written is left for a later pass (the heartbeat at the latest).
+        if time.time() - path.stat().st_mtime < SETTLE_SECONDS:
+            continue
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            urls.extend(line.strip() for line in f if line.strip().startswith(("http://", "https://")))
+        imported_dir.mkdir(exist_ok=True)
+        path.replace(imported_dir / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{path.name}")
+    return add_csv_entries(urls) if urls else 0
+
+
+class Daemon:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.stopping = threading.Event()
+        self.in_flight = {}
+        self.attempted = set()
+        self.counts = {"done": 0, "failed": 0}
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.last_error = ""
+
+    def stop(self, signum=None, frame=None):
+        if not self.stopping.is_set():
+            print("\nStopping after in-flight postings...")
+        self.stopping.set()
+
+    def write_status(self, state: str, queued: int = 0):
+        status = {
+            "pid": os.getpid(),
+            "state": state,
+            "started_at": self.started_at,
+            "heartbeat": time.time(),
+            "workers": self.workers,
+            "in_flight": sorted(self.in_flight.values()),
+            "queued": queued,
+            "processed": self.counts["done"],
+            "failed": self.counts["failed"],
+            "last_error": self.last_error,
+        }
+        atomic_write(get_status_file(), json.dumps(status, indent=2).encode("utf-8"))
+
+    def pending_entries(self) -> list[dict]:
+        return [e for e in pending_entries(read_csv_entries()) if url_key(e['url']) not in self.attempted]
+
+    def collect(self, futures, eml_paths: list):
+        for future in futures:
+            url = self.in_flight.pop(future)
+            try:
+                metadata = future.result()
+            except Exception as e:
+                self.last_error = f"{url}: {e}"
+                print(f"Failed: {url}: {e}\n")
+                metadata = {'status': 'failed', 'notes': str(e)[:200],
+                            'date_processed': datetime.now().strftime("%Y-%m-%d %H:%M")}
+            if metadata:
+                update_csv_entry(url, metadata)
+                if metadata.get('eml_path'):
+                    eml_paths.append(Path(metadata['eml_path']))
+            self.counts["done" if metadata.get('status') == 'done' else "failed"] += 1
+
+    def run(self):
+        tracker = get_tracker_file().resolve()
+        read_csv_entries()
+        drop_dir = Path(os.getenv("WATCH_DIR")) if os.getenv("WATCH_DIR") else None
+        directories = [tracker.parent]
+        if drop_dir:
+            drop_dir.mkdir(parents=True, exist_ok=True)
+            directories.append(drop_dir)
+
+        watcher = Watcher(directories)
+        eml_paths = []
+        print(f"Watching {', '.join(str(d) for d in directories)} with {self.workers} worker(s)")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="posting") as executor:
+            while True:
+                if drop_dir and not self.stopping.is_set():
+                    added = import_drop_dir(drop_dir)
+                    if added:
+                        print(f"Imported {added} URL(s) from {drop_dir}")
+
+                pending = [] if self.stopping.is_set() else self.pending_entries()
+                while pending and len(self.in_flight) < self.workers:
+                    entry = pending.pop(0)
+                    url = entry['url'].strip()
+                    self.attempted.add(url_key(url))
+                    self.in_flight[executor.submit(process_url, url, "", entry)] = url
+
+                if self.stopping.is_set() and not self.in_flight:
+                    break
+                self.write_status("stopping" if self.stopping.is_set() else "busy" if self.in_flight else "idle",
+                                  len(pending))
+
+                if self.in_flight:
+                    done, _ = wait(list(self.in_flight), timeout=1.0, return_when=FIRST_COMPLETED)
+                    self.collect(done, eml_paths)
+                    continue
+
+                export_drafts(eml_paths)
+                eml_paths.clear()
+                deadline = time.monotonic() + HEARTBEAT_SECONDS
+                while not self.stopping.is_set() and time.monotonic() < deadline:
+                    if watcher.wait(1.0):
+                        break
+
+        export_drafts(eml_paths)
+        watcher.close()
+        self.write_status("stopped")
+        print(f"Stopped: {self.counts['done']} done, {self.counts['failed']} failed")
+
+
+def check_health(max_age: float = 3 * HEARTBEAT_SECONDS) -> int:
+    try:
+        status = json.loads(get_status_file().read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 1
+    return 0 if status["state"] != "stopped" and time.time() - status["heartbeat"] < max_age else 1
+
+
+def run(workers: int = None):
+    daemon = Daemon(max(1, workers or int(os.getenv("WORKERS", "1"))))
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run()
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv:
+        sys.exit(check_health())
+    run()
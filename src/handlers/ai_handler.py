@@ -1,23 +1,70 @@
 import os
 import json
+import functools
 import re
-from datetime import datetime
-from openai import OpenAI
-from docx import Document
+import threading
+
+from handlers import batch_handler, language_detect
+from handlers.docx_patch import read_paragraph_texts
+from handlers.tracing import traced
 
 def get_ai_client():
-    return OpenAI(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        base_url=os.getenv("AI_ENDPOINT", "https://api.openai.com/v1")
-    )
+    return _client(os.getenv("OPENAI_API_KEY"), os.getenv("AI_ENDPOINT", "https://api.openai.com/v1"))
+
+@functools.lru_cache(maxsize=4)
+def _client(api_key: str, base_url: str):
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+_usage_lock = threading.Lock()
+_usage = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+
+def _record_usage(usage):
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) or 0
+    with _usage_lock:
+        _usage["requests"] += 1
+        _usage["prompt_tokens"] += usage.prompt_tokens or 0
+        _usage["cached_tokens"] += cached
+        _usage["completion_tokens"] += usage.completion_tokens or 0
+
+
+def get_usage() -> dict:
+    with _usage_lock:
+        return dict(_usage)
+
+
+def reset_usage():
+    with _usage_lock:
+        for key in _usage:
+            _usage[key] = 0
+
 
+def _extra_body() -> dict:
+    keep_alive = os.getenv("AI_KEEP_ALIVE")
+    return {"keep_alive": keep_alive} if keep_alive else {}
+
+
+@traced("llm.chat")
 def _chat(system: str, user: str, temperature: float = 0) -> str:
+    # Providers and local servers (vLLM, llama.cpp, Ollama) only reuse a cached prefix, so
+    # callers put instructions and template content in `system` and per-posting text in `user`.
+    body = {
+        "model": os.getenv("GPT_MODEL", "gpt-4.1-mini"),
+        "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+        "temperature": temperature,
+    }
+    batched = batch_handler.lookup(body)
+    if batched is not None:
+        return batched
+
     client = get_ai_client()
-    response = client.chat.completions.create(
-        model=os.getenv("GPT_MODEL", "gpt-4.1-mini"),
-        messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-        temperature=temperature
-    )
+    response = client.chat.completions.create(**body, extra_body=_extra_body() or None)
+    _record_usage(response.usage)
     return response.choices[0].message.content.strip()
 
 def get_company_name(job_posting: str) -> str:
@@ -41,6 +88,10 @@ def get_job_location(job_posting: str) -> str:
     )
 
 def detect_language(job_posting: str) -> str:
+    language, confidence = language_detect.detect(job_posting)
+    if confidence >= language_detect.get_threshold():
+        return language
+
     return _chat(
         "Detect the language of the text and respond with only the ISO 639-1 language code (e.g., 'fr', 'en', 'de', 'es', 'ja', etc.). Return ONLY the 2-letter code, nothing else.",
         job_posting[:500]
@@ -51,21 +102,21 @@ def get_cover_letter_label(language: str) -> str:
 
 def get_email_subject(position_title: str, job_field: str, candidate_name: str, language: str) -> str:
     return _chat(
-        "Return ONLY a short professional email subject line for a job application. No quotes, no explanation.",
-        f"Compose an email subject in language '{language}' for: position='{position_title}', field='{job_field}', candidate='{candidate_name}'. Format like: Candidature - [Position] - [Field] - [Name] (adapt 'Candidature' to the language).",
+        """Return ONLY a short professional email subject line for a job application. No quotes, no explanation.
+Compose it in the requested language, formatted like: Candidature - [Position] - [Field] - [Name] (adapt 'Candidature' to the language).""",
+        f"LANGUAGE: ISO code {language}\nPOSITION: {position_title}\nFIELD: {job_field}\nCANDIDATE: {candidate_name}",
     )
 
 def get_cv_updates(job_posting: str, language: str) -> dict:
-    todays_date = datetime.now().strftime("%Y-%m-%d")
-    prompt = f"""Extract CV header updates from this job posting.
-JOB POSTING: {job_posting}
-TODAY'S DATE: {todays_date}
+    todays_date = batch_handler.today()
+    system = """Return only valid JSON. No other text.
+Extract CV header updates from the job posting given by the user.
 Return JSON with:
-- "job_field": The SECTOR/DOMAIN of the position, NOT the job title. Use 1-2 words maximum. Examples: Financial Analyst → "Finance", Management Controller → "Controlling". Keep it in the SAME LANGUAGE as the job posting (ISO code: {language}).
-- "start_date": Start month in the format and language of the job posting. If not specified, use current month+1.
+- "job_field": The SECTOR/DOMAIN of the position, NOT the job title. Use 1-2 words maximum. Examples: Financial Analyst → "Finance", Management Controller → "Controlling". Keep it in the SAME LANGUAGE as the job posting (its ISO code is given as LANGUAGE).
+- "start_date": Start month in the format and language of the job posting. If not specified, use the month after TODAY'S DATE.
 Return ONLY valid JSON."""
 
-    content = _chat("Return only valid JSON. No other text.", prompt)
+    content = _chat(system, f"LANGUAGE: {language}\nTODAY'S DATE: {todays_date}\nJOB POSTING: {job_posting}")
     content = content.replace('```json', '').replace('```', '').strip()
 
     try:
@@ -75,22 +126,17 @@ Return ONLY valid JSON."""
         return {"job_field": "Finance", "start_date": "February"}
 
 
-def get_cv_replacements(header_text: str, updates: dict) -> dict:
-    job_field = updates.get('job_field', '')
-    start_date = updates.get('start_date', '')
-    
-    prompt = f"""Analyze this CV header text and identify EXACTLY which words need to be replaced.
+def analyze_cv_header(header_text: str) -> dict | None:
+    prompt = f"""Analyze this CV header text and identify the EXACT substrings that change from one job application to the next.
 
 CV HEADER TEXT:
 {header_text}
 
-REPLACEMENTS NEEDED:
-- Find the business domain/field word (like "Finance", "Marketing", "Audit", "Controlling", etc.) and replace with: "{job_field}"
-- Find the start month (like "Février", "March", "Januar", etc.) and replace with: "{start_date}"
-
-Return a JSON object where keys are the EXACT original words found in the text, and values are what to replace them with.
-Only include words that actually exist in the text and need replacing.
-Example: {{"Finance": "Controlling", "Février": "Mars"}}
+Return a JSON object with:
+- "job_field": the business domain/field word(s) exactly as written in the text (like "Finance", "Marketing", "Audit", "Controlling", etc.)
+- "start_date": the start month exactly as written in the text (like "Février", "March", "Januar", etc.)
+Each value MUST be copied character for character from the text. Use an empty string if it does not appear.
+Example: {{"job_field": "Finance", "start_date": "Février"}}
 
 Return ONLY valid JSON, no explanations."""
 
@@ -98,18 +144,21 @@ Return ONLY valid JSON, no explanations."""
     content = content.replace('```json', '').replace('```', '').strip()
 
     try:
-        return json.loads(content)
+        analysis = json.loads(content)
     except json.JSONDecodeError:
-        print(f"Warning: Invalid JSON for replacements: {content}")
-        return {}
+        analysis = None
+    if not isinstance(analysis, dict):
+        print(f"Warning: Invalid JSON for CV header analysis: {content}")
+        return None
+    return analysis
 
 
 def get_new_cover_letter_paragraphs(job_posting: str, company_name: str, template_path, language: str) -> list:
-    doc = Document(template_path)
-    original_paragraphs = [p.text for p in doc.paragraphs]
-    todays_date = datetime.now().strftime("%Y-%m-%d")
+    original_paragraphs = read_paragraph_texts(template_path)
+    todays_date = batch_handler.today()
 
-    prompt = f"""Return a JSON array of paragraph texts (strings) for a cover letter, matching the exact structure and number of paragraphs from the example. 
+    system = f"""Return only a valid JSON array of strings. No other text.
+Return a JSON array of paragraph texts (strings) for a cover letter, matching the exact structure and number of paragraphs from the example.
 
 CRITICAL RULES:
 1) Copy the ENTIRE example EXACTLY except for these specific changes:
@@ -120,22 +169,20 @@ CRITICAL RULES:
    - Do NOT change the personal info (name, address, email, phone) present in the original template.
 2) EVERYTHING ELSE must be IDENTICAL to the example - same personal info, same experiences, same wording, same closing.
 3) The applicant's full name MUST appear once at the end of the letter, as in the original.
-4) LANGUAGE QUALITY: Write in fluent, native-level {language}. 
+4) LANGUAGE QUALITY: Write in fluent, native-level language matching the ISO code given as LANGUAGE.
    - Avoid anglicisms and literal translations.
    - Use natural expressions native speakers would use.
    - Avoid "patterns", "process", corporate and meaningless sentences.
 5) After the subject line, there MUST be an empty paragraph (empty string "") before the salutation
 6) The signature at the end should appear ONLY ONCE
 
-JOB POSTING: {job_posting}
-COMPANY: {company_name}
-TODAY'S DATE: {todays_date}
 ORIGINAL PARAGRAPHS:
 {chr(10).join(f'{i}: "{p}"' for i, p in enumerate(original_paragraphs))}
 
 Return a JSON array with EXACTLY {len(original_paragraphs)} elements, preserving empty strings where the original has them."""
 
-    content = _chat("Return only a valid JSON array of strings. No other text.", prompt, temperature=0.5)
+    user = f"LANGUAGE: {language}\nTODAY'S DATE: {todays_date}\nCOMPANY: {company_name}\nJOB POSTING: {job_posting}"
+    content = _chat(system, user, temperature=0.5)
     content = content.replace('```json', '').replace('```', '').strip()
 
     try:
@@ -149,33 +196,129 @@ Return a JSON array with EXACTLY {len(original_paragraphs)} elements, preserving
             return original_paragraphs
 
 
-def generate_email_body(company_name: str, position_title: str, language: str, template_path) -> str:
-    doc = Document(template_path)
-    candidate_name = doc.paragraphs[0].text.strip()
+def analyze_cover_letter_template(paragraphs: list[str]) -> dict | None:
+    system = """Return only valid JSON.
+Analyze the COVER LETTER TEMPLATE given by the user (numbered paragraphs) and identify the parts that change from one job application to the next.
+Return a JSON object with:
+- "company_block": list of the paragraph numbers forming the recipient company address block (company name, department, city), in order
+- "date": the paragraph number of the date line
+- "job_title": the job title applied for, exactly as written in the subject line or introduction (copied character for character)
+- "job_title_paragraphs": the paragraph numbers of the subject line and introduction where that job title appears
+- "tailored": the paragraph number of the paragraph explaining why the applicant wants to join this specific company
+Use null (or an empty list) for a part that does not appear.
+Example: {"company_block": [4, 5, 6], "date": 8, "job_title": "Contrôleur de gestion", "job_title_paragraphs": [10, 12], "tailored": 15}
+Return ONLY valid JSON, no explanations."""
+
+    user = "COVER LETTER TEMPLATE:\n" + "\n".join(f'{i}: "{p}"' for i, p in enumerate(paragraphs))
+    content = _chat(system, user)
+    content = content.replace('```json', '').replace('```', '').strip()
 
-    phone_number = ""
-    for para in doc.paragraphs[:5]:
-        phone_match = re.search(r'\+?\d[\d\s\-\(\)]{8,}', para.text)
+    try:
+        analysis = json.loads(content)
+    except json.JSONDecodeError:
+        analysis = None
+    if not isinstance(analysis, dict):
+        print(f"Warning: Invalid JSON for cover letter analysis: {content}")
+        return None
+    return analysis
+
+
+def get_cover_letter_slot_values(job_posting: str, company_name: str, paragraphs: list[str], slots: dict, language: str) -> dict:
+    todays_date = batch_handler.today()
+    markers = {i: "COMPANY BLOCK" for i in slots.get("company_block", [])}
+    for key in ("date", "tailored"):
+        if key in slots:
+            markers[slots[key]] = key.upper()
+
+    fields = []
+    if slots.get("company_block"):
+        fields.append(f'- "company_block": a list of exactly {len(slots["company_block"])} lines replacing the COMPANY BLOCK '
+                      '(company name, department, city - do NOT invent street addresses; use "" for a line you cannot fill)')
+    if "date" in slots:
+        fields.append("- \"date\": the new DATE line for TODAY'S DATE, in the same format and language as the original")
+    if slots.get("job_title"):
+        fields.append(f'- "job_title": the title of the position applied for, replacing "{slots["job_title"]}" '
+                      'in the subject line and introduction, as it would read in the original sentences')
+    if "tailored" in slots:
+        fields.append('- "tailored": a new version of the TAILORED paragraph, specific to this company and job posting, '
+                      'of similar length and tone')
+
+    system = f"""Return only a valid JSON object. No other text.
+You adapt a cover letter template to a job posting. Only the parts listed below change; every other paragraph is kept as is and is shown for context.
+
+COVER LETTER:
+{chr(10).join(f'{i}: "{p}"' + (f"  <- {markers[i]}" if i in markers else "") for i, p in enumerate(paragraphs))}
+
+Return a JSON object with:
+{chr(10).join(fields)}
+
+LANGUAGE QUALITY: Write in fluent, native-level language matching the ISO code given as LANGUAGE.
+- Avoid anglicisms and literal translations.
+- Use natural expressions native speakers would use.
+- Avoid "patterns", "process", corporate and meaningless sentences."""
+
+    user = f"LANGUAGE: {language}\nTODAY'S DATE: {todays_date}\nCOMPANY: {company_name}\nJOB POSTING: {job_posting}"
+    content = _chat(system, user, temperature=0.5)
+    content = content.replace('```json', '').replace('```', '').strip()
+
+    try:
+        values = json.loads(content)
+    except json.JSONDecodeError:
+        try:
+            values = json.loads(re.sub(r'[\x00-\x1f\x7f-\x9f]', '', content))
+        except json.JSONDecodeError:
+            print(f"Warning: Invalid JSON for cover letter slots: {content}")
+            return {}
+    return values if isinstance(values, dict) else {}
+
+
+def email_signature(template_path) -> str:
+    paragraphs = read_paragraph_texts(template_path)
+    signature = f"\n\n{paragraphs[0].strip()}"
+    for text in paragraphs[:5]:
+        phone_match = re.search(r'\+?\d[\d\s\-\(\)]{8,}', text)
         if phone_match:
-            phone_number = phone_match.group(0)
+            signature += f"\n{phone_match.group(0)}"
             break
+    return signature
 
-    prompt = f"""Generate a professional, natural email body for a job application.
-COMPANY: {company_name}
-POSITION: {position_title}
-LANGUAGE: ISO code {language}
 
-RULES:
+_EMAIL_BODY_RULES = """RULES:
 - Two short paragraphs: first to introduce yourself and mention the position, second to mention attachments and availability.
 - Use the CORRECT gender for the candidate name "{candidate_name}" (masculine/feminine forms, no gender-neutral parentheses like "motivé(e)").
 - Sound natural and human, not corporate or robotic. Write like a real person would.
 - No filler sentences, no meaningless corporate fluff.
-- End with just the closing phrase (e.g. "Cordialement,"), NO name after it.
+- End with just the closing phrase (e.g. "Cordialement,"), NO name after it."""
+
+
+def generate_email_body(company_name: str, position_title: str, language: str, template_path) -> str:
+    candidate_name = read_paragraph_texts(template_path)[0].strip()
+    system = f"""Generate a natural, human-sounding email body for a job application. Return only the email text.
+
+{_EMAIL_BODY_RULES.format(candidate_name=candidate_name)}
+- Write in the language given as LANGUAGE, for the given COMPANY and POSITION.
 Return ONLY the email body text."""
 
-    email_body = _chat("Generate a natural, human-sounding email body. Return only the email text.", prompt, temperature=0.5)
-    signature = f"\n\n{candidate_name}"
-    if phone_number:
-        signature += f"\n{phone_number}"
+    email_body = _chat(system, f"LANGUAGE: ISO code {language}\nCOMPANY: {company_name}\nPOSITION: {position_title}", temperature=0.5)
+    return email_body + email_signature(template_path)
+
+
+def generate_email_body_template(language: str, template_path) -> str:
+    candidate_name = read_paragraph_texts(template_path)[0].strip()
+    system = f"""Generate a reusable email body template for job applications. Return only the template text.
 
-    return email_body + signature
\ No newline at end of file
+{_EMAIL_BODY_RULES.format(candidate_name=candidate_name)}
+- Write in the language given as LANGUAGE.
+- Write the literal placeholders {{company}} and {{position}} where the company name and the position title go; they are filled in later, so the sentences must read naturally around any company name and job title.
+Return ONLY the email body template text."""
+
+    return _chat(system, f"LANGUAGE: ISO code {language}", temperature=0.5)
+
+
+def get_email_subject_template(candidate_name: str, language: str) -> str:
+    return _chat(
+        """Return ONLY a reusable email subject template for job applications. No quotes, no explanation.
+Compose it in the requested language, formatted like: Candidature - {position} - {field} - [Name] (adapt 'Candidature' to the language).
+Keep the literal placeholders {position} and {field}; they are filled in later.""",
+        f"LANGUAGE: ISO code {language}\nCANDIDATE: {candidate_name}",
+    )
@@ -0,0 +1,100 @@
+import os
+import sys
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+
+from handlers.cache import get_cache_dir, text_hash
+
+_hash_lock = threading.Lock()
+_file_hashes = {}
+
+
+FICLONE = 0x40049409
+
+
+def get_mode() -> str:
+    return os.getenv("ARTIFACT_CACHE", "copy").lower()
+
+
+def is_enabled() -> bool:
+    return get_mode() != "off"
+
+
+def get_store_dir() -> Path:
+    store = get_cache_dir() / "artifacts"
+    store.mkdir(parents=True, exist_ok=True)
+    return store
+
+
+def file_hash(path: Path) -> str:
+    stat = path.stat()
+    cache_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    with _hash_lock:
+        if cache_key in _file_hashes:
+            return _file_hashes[cache_key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    with _hash_lock:
+        _file_hashes[cache_key] = digest.hexdigest()
+    return _file_hashes[cache_key]
+
+
+def _reflink(source: Path, dest: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(source, "rb") as src, open(dest, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        dest.unlink(missing_ok=True)
+        return False
+
+
+def _place(source: Path, dest: Path):
+    # Never a hard link: the placed file is the user's to edit, and editing it in place
+    # must not change the stored copy. A reflink shares blocks only until either is written.
+    dest.unlink(missing_ok=True)
+    if get_mode() == "reflink" and _reflink(source, dest):
+        return
+    shutil.copyfile(source, dest)
+
+
+def _store(path: Path, key: str):
+    target = get_store_dir() / f"{key}{path.suffix}"
+    if target.exists() or not path.exists():
+        return
+    tmp = target.with_name(f".{target.name}.{threading.get_ident()}")
+    shutil.copyfile(path, tmp)
+    os.replace(tmp, target)
+
+
+def reuse(key: str, dest: Path) -> bool:
+    if not is_enabled():
+        return False
+    stored = get_store_dir() / f"{key}{dest.suffix}"
+    if not stored.exists():
+        return False
+    _place(stored, dest)
+    return True
+
+
+def build_or_reuse(dest: Path, build, *key_parts: str) -> bool:
+    key = text_hash(*key_parts)
+    if reuse(key, dest):
+        return True
+    build()
+    if is_enabled():
+        _store(dest, key)
+    return False
+
+
+def convert_or_reuse(docx_path: Path, pdf_path: Path, convert) -> bool:
+    return build_or_reuse(pdf_path, lambda: convert(docx_path, pdf_path), "pdf", file_hash(docx_path))
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from handlers.cache import get_cache_dir, load_json, save_json, text_hash
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchPending(Exception):
+    pass
+
+
+_lock = threading.Lock()
+_collecting = False
+_results = {}
+_pending = {}
+_today = None
+
+
+def is_collecting() -> bool:
+    return _collecting
+
+
+def start_collecting():
+    global _collecting, _today
+    with _lock:
+        _results.clear()
+        _results.update(load_json("batch_results") or {})
+        _pending.clear()
+        # Prompts carry today's date and requests are keyed by their body, so the date is
+        # pinned for the whole run: a batch finishing after midnight still matches.
+        pinned = load_json("batch_date") or {}
+        _today = pinned.get("date") or datetime.now().strftime("%Y-%m-%d")
+        save_json("batch_date", {"date": _today})
+        _collecting = True
+
+
+def today() -> str:
+    return _today if _collecting and _today else datetime.now().strftime("%Y-%m-%d")
+
+
+def stop_collecting():
+    global _collecting
+    with _lock:
+        _collecting = False
+
+
+def pending_count() -> int:
+    return len(_pending)
+
+
+def lookup(body: dict):
+    if not _collecting:
+        return None
+    custom_id = text_hash(json.dumps(body, sort_keys=True, ensure_ascii=False))[:32]
+    with _lock:
+        if custom_id in _results:
+            return _results[custom_id]
+        _pending[custom_id] = body
+    raise BatchPending(custom_id)
+
+
+def _write_input_file() -> Path:
+    path = get_cache_dir() / "batch_input.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, body in _pending.items():
+            f.write(json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body},
+                               ensure_ascii=False) + "\n")
+    return path
+
+
+def submit_and_wait() -> int:
+    from openai.types import CompletionUsage
+
+    from handlers.ai_handler import _record_usage, get_ai_client
+
+    client = get_ai_client()
+    poll_seconds = float(os.getenv("BATCH_POLL_SECONDS", "60"))
+    state = load_json("batch_state")
+    if state and not set(_pending) <= set(state.get("ids", [])):
+        print(f"Warning: Batch {state['batch_id']} does not cover the pending requests, submitting a new one")
+        state = None
+
+    if not state:
+        input_path = _write_input_file()
+        with open(input_path, "rb") as f:
+            uploaded = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=uploaded.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        state = {"batch_id": batch.id, "requests": len(_pending), "ids": sorted(_pending)}
+        save_json("batch_state", state)
+        print(f"Submitted batch {batch.id} with {len(_pending)} request(s)")
+    else:
+        print(f"Resuming batch {state['batch_id']}")
+
+    while True:
+        batch = client.batches.retrieve(state["batch_id"])
+        if batch.status in TERMINAL_STATUSES:
+            break
+        counts = batch.request_counts
+        done = f"{counts.completed}/{counts.total}" if counts else "?"
+        print(f"Batch {batch.id}: {batch.status} ({done}), next check in {poll_seconds:.0f}s")
+        time.sleep(poll_seconds)
+
+    received = 0
+    if batch.output_file_id:
+        content = client.files.content(batch.output_file_id).text
+        with _lock:
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                _results[item["custom_id"]] = response["body"]["choices"][0]["message"]["content"].strip()
+                if response["body"].get("usage"):
+                    _record_usage(CompletionUsage.model_validate(response["body"]["usage"]))
+                received += 1
+            save_json("batch_results", _results)
+
+    if batch.status != "completed":
+        print(f"Warning: Batch {batch.id} ended with status {batch.status}")
+    print(f"Batch {batch.id}: {received} result(s) received")
+
+    (get_cache_dir() / "batch_state.json").unlink(missing_ok=True)
+    with _lock:
+        _pending.clear()
+    return received
+
+
+def clear_results():
+    (get_cache_dir() / "batch_results.json").unlink(missing_ok=True)
+    (get_cache_dir() / "batch_date.json").unlink(missing_ok=True)
+    with _lock:
+        _results.clear()
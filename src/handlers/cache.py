@@ -0,0 +1,45 @@
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+
+def get_cache_dir() -> Path:
+    default = Path(os.getenv("OUTPUT_BASE_DIR", ".")) / ".cache"
+    cache_dir = Path(os.getenv("CACHE_DIR", default))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def text_hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def load_json(name: str):
+    path = get_cache_dir() / f"{name}.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_json(name: str, data):
+    atomic_write(get_cache_dir() / f"{name}.json", json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
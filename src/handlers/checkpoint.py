@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+from handlers.cache import atomic_write, get_cache_dir, text_hash
+from handlers.url_utils import url_key
+
+
+class Checkpoint:
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            self.data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.data = {}
+        self.resumed = bool(self.data)
+
+    def _save(self):
+        atomic_write(self.path, json.dumps(self.data, ensure_ascii=False).encode("utf-8"))
+
+    def value(self, stage: str, compute):
+        if stage in self.data:
+            return self.data[stage]
+        result = compute()
+        self.data[stage] = result
+        self._save()
+        return result
+
+    def artifact(self, stage: str, choose_path, build) -> Path:
+        entry = self.data.get(stage)
+        if entry and entry["done"] and Path(entry["path"]).exists():
+            return Path(entry["path"])
+
+        path = Path(entry["path"]) if entry else choose_path()
+        self.data[stage] = {"path": str(path), "done": False}
+        self._save()
+        build(path)
+        self.data[stage]["done"] = True
+        self._save()
+        return path
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+        self.data = {}
+
+
+def load_checkpoint(url: str = None, job_posting: str = "") -> Checkpoint:
+    key = url_key(url) if url else ""
+    key = key or text_hash(job_posting)[:24]
+    return Checkpoint(get_cache_dir() / "checkpoints" / f"{key}.json")
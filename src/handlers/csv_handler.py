@@ -2,7 +2,10 @@ import os
 import csv
 from pathlib import Path
 
-CSV_FIELDNAMES = ['url', 'status', 'company', 'position', 'location', 'language', 'date_processed', 'notes']
+from handlers.url_utils import url_key
+
+CSV_FIELDNAMES = ['url', 'status', 'company', 'position', 'location', 'language', 'date_processed', 'notes',
+                  'source', 'posted_at']
 
 
 def get_tracker_file():
@@ -35,15 +38,50 @@ def write_csv_entries(entries: list[dict]):
         writer.writerows(cleaned_entries)
 
 
+def build_url_index(entries: list[dict]) -> dict[str, dict]:
+    index = {}
+    for entry in entries:
+        key = url_key(entry.get('url') or '')
+        if key and key not in index:
+            index[key] = entry
+    return index
+
+
+def pending_entries(entries: list[dict]) -> list[dict]:
+    # One entry per posting: rows sharing a canonical URL are the same job, which is
+    # pending only while none of its rows is done.
+    done = {url_key(e.get('url') or '') for e in entries if (e.get('status') or '').lower() == 'done'}
+    pending = []
+    for key, entry in build_url_index(entries).items():
+        if key not in done:
+            pending.append(entry)
+    return pending
+
+
 def update_csv_entry(url: str, updates: dict):
     entries = read_csv_entries()
-    for entry in entries:
-        if entry['url'] == url:
-            entry.update(updates)
-            break
+    entry = build_url_index(entries).get(url_key(url))
+    if entry is not None:
+        entry.update(updates)
     write_csv_entries(entries)
 
-def add_csv_entry(url: str):
+
+def add_csv_entry(url: str, **fields):
+    add_csv_entries([{'url': url, **fields}])
+
+
+def add_csv_entries(rows: list) -> int:
     entries = read_csv_entries()
-    entries.append({'url': url})
-    write_csv_entries(entries)
\ No newline at end of file
+    index = build_url_index(entries)
+    added = 0
+    for row in rows:
+        entry = dict(row) if isinstance(row, dict) else {'url': row}
+        key = url_key(entry.get('url') or '')
+        if not key or key in index:
+            continue
+        entries.append(entry)
+        index[key] = entry
+        added += 1
+    if added:
+        write_csv_entries(entries)
+    return added
@@ -1,72 +1,186 @@
 import os
 import shutil
+import threading
 from pathlib import Path
-from docx import Document
 
-from handlers.ai_handler import get_cv_replacements
+from handlers import docx_patch
+from handlers.ai_handler import (
+    analyze_cv_header, analyze_cover_letter_template, get_cover_letter_slot_values, get_new_cover_letter_paragraphs
+)
+from handlers.cache import load_json, save_json, text_hash
+from handlers.tracing import traced
 
+_slots_lock = threading.Lock()
+_cover_letter_lock = threading.Lock()
 
-def modify_cv_header(cv_path: Path, output_path: Path, updates: dict):
-    shutil.copy(cv_path, output_path)
-    doc = Document(output_path)
 
+def get_cv_header_slots(header_template: str) -> dict:
+    with _slots_lock:
+        return _load_cv_header_slots(header_template)
+
+
+def _load_cv_header_slots(header_template: str) -> dict:
+    template_hash = text_hash(header_template)
+    cached = load_json("cv_header_slots")
+    if cached and cached.get("template_hash") == template_hash:
+        return cached["slots"]
+
+    analysis = analyze_cv_header(header_template)
+    if analysis is None:
+        # An unreadable reply says nothing about the template: retry on the next posting.
+        return {}
+
+    slots = {}
+    for key, original in analysis.items():
+        start = header_template.find(original) if isinstance(original, str) and original else -1
+        if start >= 0:
+            slots[key] = [start, start + len(original)]
+
+    ordered = sorted(slots.values())
+    if any(a[1] > b[0] for a, b in zip(ordered, ordered[1:])):
+        print("Warning: Overlapping CV header slots, ignoring analysis")
+        slots = {}
+
+    save_json("cv_header_slots", {"template_hash": template_hash, "template": header_template, "slots": slots})
+    return slots
+
+
+def fill_cv_header(header_template: str, slots: dict, updates: dict) -> str:
+    new_header = header_template
+    for key, (start, end) in sorted(slots.items(), key=lambda item: item[1][0], reverse=True):
+        value = updates.get(key)
+        if value:
+            new_header = new_header[:start] + value + new_header[end:]
+    return new_header
+
+
+def get_cover_letter_slots(template_path: Path) -> dict:
+    paragraphs = docx_patch.read_paragraph_texts(template_path)
+    with _cover_letter_lock:
+        return _load_cover_letter_slots(paragraphs)
+
+
+def _load_cover_letter_slots(paragraphs: list[str]) -> dict:
+    template_hash = text_hash(*paragraphs)
+    cached = load_json("cover_letter_slots")
+    if cached and cached.get("template_hash") == template_hash:
+        return cached["slots"]
+
+    analysis = analyze_cover_letter_template(paragraphs)
+    if analysis is None:
+        return {}
+    is_index = lambda value: isinstance(value, int) and not isinstance(value, bool) and 0 <= value < len(paragraphs)
+
+    slots = {}
+    block = analysis.get("company_block") or []
+    if isinstance(block, list) and block and all(is_index(i) for i in block):
+        slots["company_block"] = block
+    for key in ("date", "tailored"):
+        if is_index(analysis.get(key)):
+            slots[key] = analysis[key]
+    job_title = analysis.get("job_title")
+    title_paragraphs = analysis.get("job_title_paragraphs") or []
+    if isinstance(job_title, str) and job_title and isinstance(title_paragraphs, list):
+        # Only the subject line and introduction get the new title; the title may also
+        # appear in paragraphs that must stay verbatim.
+        title_paragraphs = [i for i in title_paragraphs if is_index(i) and job_title in paragraphs[i]]
+        if title_paragraphs:
+            slots["job_title"] = job_title
+            slots["job_title_paragraphs"] = sorted(set(title_paragraphs))
+
+    indices = slots.get("company_block", []) + [slots[k] for k in ("date", "tailored") if k in slots]
+    if len(indices) != len(set(indices)):
+        print("Warning: Overlapping cover letter slots, ignoring analysis")
+        slots = {}
+
+    # A parsed reply without slots is cached too, so such a template goes straight to full
+    # regeneration; an unreadable reply is retried on the next posting instead.
+    save_json("cover_letter_slots", {"template_hash": template_hash, "slots": slots})
+    return slots
+
+
+def fill_cover_letter(paragraphs: list[str], slots: dict, values: dict) -> list[str]:
+    new_paragraphs = list(paragraphs)
+
+    job_title, new_title = slots.get("job_title"), values.get("job_title")
+    if job_title and isinstance(new_title, str) and new_title.strip():
+        for index in slots.get("job_title_paragraphs", []):
+            new_paragraphs[index] = new_paragraphs[index].replace(job_title, new_title.strip())
+
+    block, lines = slots.get("company_block", []), values.get("company_block")
+    if block and isinstance(lines, list):
+        lines = [str(line).strip() for line in lines][:len(block)]
+        lines += [""] * (len(block) - len(lines))
+        for index, line in zip(block, lines):
+            new_paragraphs[index] = line
+
+    for key in ("date", "tailored"):
+        value = values.get(key)
+        if key in slots and isinstance(value, str) and value.strip():
+            new_paragraphs[slots[key]] = value.strip()
+    return new_paragraphs
+
+
+def build_cover_letter_paragraphs(job_posting: str, company_name: str, template_path: Path, language: str) -> list[str]:
+    paragraphs = docx_patch.read_paragraph_texts(template_path)
+    slots = get_cover_letter_slots(template_path)
+    values = get_cover_letter_slot_values(job_posting, company_name, paragraphs, slots, language) if slots else {}
+    if not values:
+        return get_new_cover_letter_paragraphs(job_posting, company_name, template_path, language)
+    return fill_cover_letter(paragraphs, slots, values)
+
+
+def _replace_in_paragraph(p, header_template: str, new_header: str) -> bool:
+    paragraph_runs = docx_patch.runs(p)
+    full_text = "".join(docx_patch.run_text(r) for r in paragraph_runs)
+    if header_template not in full_text:
+        return False
+    new_full = full_text.replace(header_template, new_header)
+    for i, run in enumerate(paragraph_runs):
+        docx_patch.set_run_text(run, new_full if i == 0 else "")
+    return True
+
+
+@traced("docx.modify_cv_header")
+def modify_cv_header(cv_path: Path, output_path: Path, updates: dict):
     header_template = os.getenv("CV_HEADER_TEMPLATE", "")
-    if not header_template:
-        doc.save(output_path)
+    slots = get_cv_header_slots(header_template) if header_template else {}
+    if not slots:
+        if header_template:
+            print("Warning: No field or start month found in CV_HEADER_TEMPLATE, the CV header is left unchanged")
+        shutil.copyfile(cv_path, output_path)
         return
 
-    replacements = get_cv_replacements(header_template, updates)
-    if not replacements:
-        doc.save(output_path)
-        return
+    new_header = fill_cv_header(header_template, slots, updates)
 
-    new_header = header_template
-    for old, new in replacements.items():
-        if old and new:
-            new_header = new_header.replace(old, new)
-
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                if header_template in cell.text:
-                    for para in cell.paragraphs:
-                        full_text = "".join(r.text for r in para.runs)
-                        if header_template in full_text:
-                            new_full = full_text.replace(header_template, new_header)
-                            for i, run in enumerate(para.runs):
-                                if i == 0:
-                                    run.text = new_full
-                                else:
-                                    run.text = ""
-                            doc.save(output_path)
-                            return
-
-    for para in doc.paragraphs:
-        full_text = "".join(r.text for r in para.runs)
-        if header_template in full_text:
-            new_full = full_text.replace(header_template, new_header)
-            for i, run in enumerate(para.runs):
-                if i == 0:
-                    run.text = new_full
-                else:
-                    run.text = ""
-            doc.save(output_path)
-            return
-
-    doc.save(output_path)
+    def edit(root) -> bool:
+        for tbl in docx_patch.body_tables(root):
+            for cell_paragraphs in docx_patch.table_cell_paragraphs(tbl):
+                cell_text = "\n".join(docx_patch.paragraph_text(p) for p in cell_paragraphs)
+                if header_template in cell_text:
+                    for p in cell_paragraphs:
+                        if _replace_in_paragraph(p, header_template, new_header):
+                            return True
+
+        for p in docx_patch.body_paragraphs(root):
+            if _replace_in_paragraph(p, header_template, new_header):
+                return True
+        return False
+
+    docx_patch.patch_docx(cv_path, output_path, edit)
 
 
+@traced("docx.modify_cover_letter")
 def modify_cover_letter(template_path: Path, output_path: Path, new_paragraphs: list):
-    shutil.copy(template_path, output_path)
-    doc = Document(output_path)
-
-    for i, para in enumerate(doc.paragraphs):
-        if i < len(new_paragraphs):
-            for run in para.runs[1:]:
-                run.text = ""
-            if para.runs:
-                para.runs[0].text = new_paragraphs[i]
+    def edit(root) -> bool:
+        for p, text in zip(docx_patch.body_paragraphs(root), new_paragraphs):
+            paragraph_runs = docx_patch.runs(p)
+            for run in paragraph_runs[1:]:
+                docx_patch.set_run_text(run, "")
+            if paragraph_runs:
+                docx_patch.set_run_text(paragraph_runs[0], text)
             else:
-                para.text = new_paragraphs[i]
+                docx_patch.set_paragraph_text(p, text)
+        return bool(new_paragraphs)
 
-    doc.save(output_path)
\ No newline at end of file
+    docx_patch.patch_docx(template_path, output_path, edit)
@@ -0,0 +1,186 @@
+import re
+import functools
+import shutil
+import struct
+import zipfile
+from copy import copy
+from pathlib import Path
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+W = f"{{{W_NS}}}"
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+
+def _main_part_name(zin: zipfile.ZipFile) -> str:
+    try:
+        rels = zin.read("_rels/.rels").decode("utf-8")
+    except KeyError:
+        return "word/document.xml"
+    for rel in re.findall(r"<Relationship\b[^>]*>", rels):
+        if f'Type="{OFFICE_DOCUMENT_REL}"' in rel:
+            target = re.search(r'Target="([^"]+)"', rel)
+            if target:
+                return target.group(1).lstrip("/")
+    return "word/document.xml"
+
+
+def _copy_raw(zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo):
+    # Copies the member's compressed bytes as-is; zipfile has no public API for this,
+    # so the local header is written with ZipInfo.FileHeader and registered by hand.
+    zin.fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(zin.fp.read(_LOCAL_HEADER.size))
+    zin.fp.seek(header[10] + header[11], 1)
+    raw = zin.fp.read(info.compress_size)
+
+    new_info = copy(info)
+    new_info.flag_bits &= ~0x08
+    new_info.header_offset = zout.fp.tell()
+    zout.fp.write(new_info.FileHeader())
+    zout.fp.write(raw)
+    zout.start_dir = zout.fp.tell()
+    zout.filelist.append(new_info)
+    zout.NameToInfo[new_info.filename] = new_info
+
+
+def patch_docx(template_path: Path, output_path: Path, edit) -> bool:
+    from lxml import etree
+
+    with zipfile.ZipFile(template_path) as zin:
+        part_name = _main_part_name(zin)
+        root = etree.fromstring(zin.read(part_name))
+        if not edit(root):
+            shutil.copyfile(template_path, output_path)
+            return False
+
+        xml = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+        with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                if info.filename == part_name:
+                    new_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                    new_info.compress_type = zipfile.ZIP_DEFLATED
+                    new_info.external_attr = info.external_attr
+                    zout.writestr(new_info, xml)
+                else:
+                    _copy_raw(zin, zout, info)
+    return True
+
+
+def read_paragraph_texts(path: Path) -> list[str]:
+    stat = Path(path).stat()
+    return list(_read_paragraph_texts(str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=8)
+def _read_paragraph_texts(path: str, mtime_ns: int, size: int) -> tuple[str, ...]:
+    from lxml import etree
+
+    with zipfile.ZipFile(path) as zin:
+        root = etree.fromstring(zin.read(_main_part_name(zin)))
+    return tuple(paragraph_text(p) for p in body_paragraphs(root))
+
+
+def read_document_text(path: Path) -> str:
+    stat = Path(path).stat()
+    return _read_document_text(str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_document_text(path: str, mtime_ns: int, size: int) -> str:
+    from lxml import etree
+
+    with zipfile.ZipFile(path) as zin:
+        root = etree.fromstring(zin.read(_main_part_name(zin)))
+    return "\n".join(paragraph_text(p) for p in body(root).iter(f"{W}p"))
+
+
+def body(root):
+    return root.find(f"{W}body")
+
+
+def body_paragraphs(root) -> list:
+    return body(root).findall(f"{W}p")
+
+
+def body_tables(root) -> list:
+    return body(root).findall(f"{W}tbl")
+
+
+def runs(p) -> list:
+    return p.findall(f"{W}r")
+
+
+def run_text(r) -> str:
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == f"{W}t":
+            parts.append(child.text or "")
+        elif tag == f"{W}tab" or tag == f"{W}ptab":
+            parts.append("\t")
+        elif tag == f"{W}cr":
+            parts.append("\n")
+        elif tag == f"{W}br":
+            parts.append("\n" if child.get(f"{W}type", "textWrapping") == "textWrapping" else "")
+        elif tag == f"{W}noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(p) -> str:
+    parts = []
+    for child in p:
+        if child.tag == f"{W}r":
+            parts.append(run_text(child))
+        elif child.tag == f"{W}hyperlink":
+            parts.extend(run_text(r) for r in runs(child))
+    return "".join(parts)
+
+
+def _clear_except(element, keep_tag: str):
+    for child in list(element):
+        if child.tag != keep_tag:
+            element.remove(child)
+
+
+def _append_t(r, text: str):
+    from lxml import etree
+
+    t = etree.SubElement(r, f"{W}t")
+    t.text = text
+    if len(text.strip()) < len(text):
+        t.set(XML_SPACE, "preserve")
+
+
+def set_run_text(r, text: str):
+    from lxml import etree
+
+    _clear_except(r, f"{W}rPr")
+    buffer = []
+    for char in text:
+        if char == "\t" or char in "\r\n":
+            if buffer:
+                _append_t(r, "".join(buffer))
+                buffer.clear()
+            etree.SubElement(r, f"{W}tab" if char == "\t" else f"{W}br")
+        else:
+            buffer.append(char)
+    if buffer:
+        _append_t(r, "".join(buffer))
+
+
+def set_paragraph_text(p, text: str):
+    from lxml import etree
+
+    _clear_except(p, f"{W}pPr")
+    r = etree.SubElement(p, f"{W}r")
+    if text:
+        set_run_text(r, text)
+
+
+def table_cell_paragraphs(tbl):
+    for tr in tbl.findall(f"{W}tr"):
+        for tc in tr.findall(f"{W}tc"):
+            yield tc.findall(f"{W}p")
@@ -1,10 +1,36 @@
+import base64
+import uuid
 from pathlib import Path
+from email.generator import BytesGenerator
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 
-def create_eml_file(output_path: Path, email_body: str, cv_pdf: Path, cl_pdf: Path, subject: str):
-    msg = MIMEMultipart()
+from handlers.tracing import traced
+
+BASE64_CHUNK = 57 * 1024
+
+
+def _write_headers(out, msg):
+    policy = msg.policy.clone(max_line_length=0)
+    for name, value in msg.raw_items():
+        out.write(policy.fold_binary(name, value))
+    out.write(b"\n")
+
+
+def _write_attachment(out, path: Path):
+    attachment = MIMEApplication(b"", _subtype='pdf')
+    attachment.add_header('Content-Disposition', 'attachment', filename=path.name)
+    _write_headers(out, attachment)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(BASE64_CHUNK), b""):
+            out.write(base64.encodebytes(chunk))
+
+
+@traced("eml.create")
+def create_eml_file(output_path: Path, email_body: str, cv_pdf: Path, cl_pdf: Path, subject: str, boundary: str = None):
+    boundary = boundary or f"==============={uuid.uuid4().hex}=="
+    msg = MIMEMultipart(boundary=boundary)
     msg['Subject'] = subject
     msg['From'] = ""
     msg['To'] = ""
@@ -12,13 +38,36 @@ def create_eml_file(output_path: Path, email_body: str, cv_pdf: Path, cl_pdf: Pa
     html_body = email_body.replace('\n', '<br>')
     html = f"""<html><body><div style="font-family: Calibri, Arial, sans-serif; font-size: 14px;">{html_body}</div></body></html>"""
 
-    msg.attach(MIMEText(html, 'html', 'utf-8'))
+    with open(output_path, 'wb') as out:
+        _write_headers(out, msg)
+        out.write(f"--{boundary}\n".encode("ascii"))
+        BytesGenerator(out, mangle_from_=False, maxheaderlen=0).flatten(MIMEText(html, 'html', 'utf-8'), linesep="\n")
+
+        for pdf_path in [cv_pdf, cl_pdf]:
+            out.write(f"\n--{boundary}\n".encode("ascii"))
+            _write_attachment(out, pdf_path)
+
+        out.write(f"\n--{boundary}--\n".encode("ascii"))
+
+
+def export_mailbox(eml_paths: list[Path], destination: Path, mailbox_format: str = "mbox") -> int:
+    import mailbox
 
-    for pdf_path in [cv_pdf, cl_pdf]:
-        with open(pdf_path, 'rb') as f:
-            attachment = MIMEApplication(f.read(), _subtype='pdf')
-            attachment.add_header('Content-Disposition', 'attachment', filename=pdf_path.name)
-            msg.attach(attachment)
+    if mailbox_format == "maildir":
+        box = mailbox.Maildir(destination, create=True)
+    else:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        box = mailbox.mbox(destination)
 
-    with open(output_path, 'w') as f:
-        f.write(msg.as_string())
\ No newline at end of file
+    box.lock()
+    try:
+        exported = 0
+        for path in eml_paths:
+            with open(path, 'rb') as f:
+                box.add(f)
+            exported += 1
+        box.flush()
+    finally:
+        box.unlock()
+        box.close()
+    return exported
@@ -0,0 +1,69 @@
+import os
+import threading
+
+from handlers import ai_handler
+from handlers.cache import load_json, save_json, text_hash
+from handlers.docx_patch import read_paragraph_texts
+
+_lock = threading.Lock()
+
+
+def _reuse_limit() -> int:
+    return int(os.getenv("EMAIL_TEMPLATE_REUSE", "0"))
+
+
+def _cached_template(kind: str, key_parts: list[str], generate, placeholders: tuple, rotate: bool = False):
+    key = text_hash(kind, *key_parts)[:24]
+    limit = _reuse_limit() if rotate else 0
+    with _lock:
+        cache = load_json("email_templates") or {}
+        entry = cache.get(key)
+        if entry and (not limit or entry["uses"] < limit):
+            if limit:
+                entry["uses"] += 1
+                save_json("email_templates", cache)
+            return entry["template"]
+
+    template = generate().strip()
+    if not all(placeholder in template for placeholder in placeholders):
+        return None
+
+    with _lock:
+        cache = load_json("email_templates") or {}
+        cache[key] = {"kind": kind, "language": key_parts[0], "template": template, "uses": 1}
+        save_json("email_templates", cache)
+    return template
+
+
+def _fill(template: str, **values: str) -> str:
+    for name, value in values.items():
+        template = template.replace(f"{{{name}}}", value)
+    return template
+
+
+def get_cover_letter_label(language: str) -> str:
+    label = _cached_template("cover_letter_label", [language], lambda: ai_handler.get_cover_letter_label(language), ())
+    return label or ai_handler.get_cover_letter_label(language)
+
+
+def generate_email_body(company_name: str, position_title: str, language: str, template_path) -> str:
+    candidate_name = read_paragraph_texts(template_path)[0].strip()
+    template = _cached_template(
+        "email_body", [language, candidate_name],
+        lambda: ai_handler.generate_email_body_template(language, template_path),
+        ("{company}", "{position}"), rotate=True,
+    )
+    if template is None:
+        return ai_handler.generate_email_body(company_name, position_title, language, template_path)
+    return _fill(template, company=company_name, position=position_title) + ai_handler.email_signature(template_path)
+
+
+def get_email_subject(position_title: str, job_field: str, candidate_name: str, language: str) -> str:
+    template = _cached_template(
+        "email_subject", [language, candidate_name],
+        lambda: ai_handler.get_email_subject_template(candidate_name, language),
+        ("{position}",), rotate=True,
+    )
+    if template is None:
+        return ai_handler.get_email_subject(position_title, job_field, candidate_name, language)
+    return _fill(template, position=position_title, field=job_field)
@@ -1,37 +1,75 @@
 import os
+import functools
 import subprocess
+import threading
 from pathlib import Path
-import ollama
+
+from handlers.tracing import traced
+
+_filename_lock = threading.Lock()
+_reserved_paths = set()
+_convert_lock = threading.Lock()
+_converter_started = False
 
 
 def get_unique_filename(base_path: Path) -> Path:
-    if not base_path.exists():
-        return base_path
-    counter = 2
-    while True:
-        new_path = base_path.parent / f"{base_path.stem}-{counter}{base_path.suffix}"
-        if not new_path.exists():
-            return new_path
-        counter += 1
+    with _filename_lock:
+        new_path = base_path
+        counter = 2
+        while new_path.exists() or new_path in _reserved_paths:
+            new_path = base_path.parent / f"{base_path.stem}-{counter}{base_path.suffix}"
+            counter += 1
+        _reserved_paths.add(new_path)
+        return new_path
+
+
+def release_filename(path: Path):
+    # Once written, the file itself keeps the name taken; a failed build keeps its
+    # reservation so the checkpointed path stays its own until the retry.
+    with _filename_lock:
+        _reserved_paths.discard(path)
+
+
+@functools.lru_cache(maxsize=2)
+def _fetch_client(api_key: str):
+    import ollama
+    client = ollama.Client()
+    client._client.headers['Authorization'] = f'Bearer {api_key}'
+    return client
 
 
 def fetch_job_posting_from_url(url: str) -> str:
     try:
-        client = ollama.Client()
-        client._client.headers['Authorization'] = f'Bearer {os.getenv("OLLAMA_API_KEY")}'
-        result = client.web_fetch(url=url)
+        result = _fetch_client(os.getenv("OLLAMA_API_KEY")).web_fetch(url=url)
         return result.content
     except Exception as e:
         print(f"Failed to fetch: {e}")
         return None
 
 
+def _converter_profile() -> str:
+    # A dedicated profile that survives between conversions: LibreOffice only pays its
+    # first-start initialization once, and stray instances on the default profile can't
+    # swallow our requests.
+    from handlers.cache import get_cache_dir
+
+    profile = get_cache_dir() / "libreoffice-profile"
+    profile.mkdir(parents=True, exist_ok=True)
+    return profile.resolve().as_uri()
+
+
+@traced("pdf.convert")
 def convert_to_pdf(docx_path: Path, pdf_path: Path):
+    global _converter_started
     try:
-        subprocess.run(['pkill', '-f', 'soffice'], capture_output=True)
-        subprocess.run([
-            'libreoffice', '--headless', '--convert-to', 'pdf',
-            '--outdir', str(pdf_path.parent), str(docx_path)
-        ], check=True, capture_output=True, timeout=120)
+        with _convert_lock:
+            if not _converter_started:
+                subprocess.run(['pkill', '-f', 'soffice'], capture_output=True)
+                _converter_started = True
+            subprocess.run([
+                'libreoffice', f'-env:UserInstallation={_converter_profile()}', '--headless', '--convert-to', 'pdf',
+                '--outdir', str(pdf_path.parent), str(docx_path)
+            ], check=True, capture_output=True, timeout=120)
     except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired) as e:
+        _converter_started = False
         print(f"Warning: PDF conversion failed: {e}")
\ No newline at end of file
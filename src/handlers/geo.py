@@ -0,0 +1,135 @@
+import os
+import re
+import csv
+import functools
+import unicodedata
+from pathlib import Path
+
+GAZETTEER_FILE = Path(__file__).parent / "data" / "gazetteer_fr.csv"
+EARTH_RADIUS_KM = 6371.0
+
+_POSTCODE = re.compile(r"\b(\d{5})\b")
+_DEPARTMENT = re.compile(r"\(\s*(\d{2,3}|2[ABab])\s*\)|^\s*(\d{2,3}|2[ABab])\s*-|-\s*(\d{2,3}|2[ABab])\s*$")
+_SEPARATOR = re.compile(r"[,(/|]|\s[-–]\s")
+_ARRONDISSEMENT = re.compile(r"\b\d{1,2}\s*(?:e|er|eme|ème)\b(?:\s*arrondissement)?", re.IGNORECASE)
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", " ", text).strip()
+    return re.sub(r"^(st|ste)\b", lambda m: "saint" if m.group(1) == "st" else "sainte", text)
+
+
+def get_gazetteer_file() -> Path:
+    return Path(os.getenv("GAZETTEER_FILE") or GAZETTEER_FILE)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_index(path: str):
+    import numpy as np
+
+    by_name, by_postcode = {}, {}
+    departments, latitudes, longitudes = [], [], []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            departments.append(row["department"].upper())
+            latitudes.append(float(row["lat"]))
+            longitudes.append(float(row["lon"]))
+            # Rows come metropolitan first, then most populated first, so without any
+            # other hint the first one wins on homonyms.
+            by_name.setdefault(normalize(row["name"]), []).append(i)
+            for postcode in row["postcodes"].split():
+                by_postcode.setdefault(postcode, i)
+    return by_name, by_postcode, departments, np.radians(latitudes), np.radians(longitudes)
+
+
+def _department_of_postcode(postcode: str) -> str:
+    if postcode.startswith("97"):
+        return postcode[:3]
+    if postcode.startswith("20"):
+        return "2A" if int(postcode) < 20200 else "2B"
+    return postcode[:2]
+
+
+def resolve_candidates(location: str) -> list[int]:
+    # Only a postcode or a full place name counts: a department alone, or a postcode
+    # missing from the gazetteer, says too little to place an offer, so it stays unknown.
+    if not location:
+        return []
+    by_name, by_postcode, departments = _load_index(str(get_gazetteer_file()))[:3]
+
+    department = None
+    match = _DEPARTMENT.search(location)
+    if match:
+        department = next(g for g in match.groups() if g).upper().zfill(2)
+
+    for postcode in _POSTCODE.findall(location):
+        if postcode in by_postcode:
+            return [by_postcode[postcode]]
+        department = department or _department_of_postcode(postcode)
+
+    for part in _SEPARATOR.split(_ARRONDISSEMENT.sub(" ", location)):
+        # The whole part must be the name, so "Saint-Denis-en-Val" is not taken for Saint-Denis.
+        candidates = by_name.get(normalize(re.sub(r"\d+", " ", part)))
+        if not candidates:
+            continue
+        if department:
+            return [i for i in candidates if departments[i] == department]
+        return candidates
+    return []
+
+
+def resolve_index(location: str):
+    candidates = resolve_candidates(location)
+    return candidates[0] if candidates else None
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve(location: str):
+    index = resolve_index(location)
+    if index is None:
+        return None
+    latitudes, longitudes = _load_index(str(get_gazetteer_file()))[3:]
+    return float(latitudes[index]), float(longitudes[index])
+
+
+def haversine_km(lat, lon, center_lat: float, center_lon: float):
+    # All angles in radians; lat/lon may be NumPy arrays.
+    import numpy as np
+
+    dlat = lat - center_lat
+    dlon = lon - center_lon
+    a = np.sin(dlat / 2) ** 2 + np.cos(center_lat) * np.cos(lat) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def filter_by_radius(offers: list, center: str, radius_km: float) -> tuple[list, int]:
+    import numpy as np
+
+    if not offers:
+        return offers, 0
+    center_point = resolve(center)
+    if center_point is None:
+        print(f"Warning: Unknown location {center!r}, not filtering by radius")
+        return offers, 0
+
+    latitudes, longitudes = _load_index(str(get_gazetteer_file()))[3:]
+    coordinates, known = [], []
+    for offer in offers:
+        candidates = resolve_candidates(offer.location)
+        known.append(bool(candidates))
+        if not candidates:
+            coordinates.append(center_point)
+            continue
+        # A homonym ("Saint-Denis") is taken as the one nearest to the searched location.
+        distances = haversine_km(latitudes[candidates], longitudes[candidates], *center_point)
+        index = candidates[int(np.argmin(distances))]
+        coordinates.append((latitudes[index], longitudes[index]))
+
+    coordinates, known = np.array(coordinates, dtype=float), np.array(known)
+    distances = haversine_km(coordinates[:, 0], coordinates[:, 1], *center_point)
+    # Offers whose location can't be placed (remote, region only, abroad) are kept.
+    keep = ~known | (distances <= radius_km)
+    kept = [offer for offer, k in zip(offers, keep) if k]
+    return kept, len(offers) - len(kept)
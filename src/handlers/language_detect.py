@@ -0,0 +1,60 @@
+import os
+import re
+
+# Most frequent function words of each language we apply in. Words shared by several
+# languages ("de", "la", "in", ...) are kept but weighted down by the number of languages
+# they belong to, so they only tip the balance between otherwise close candidates.
+_PROFILES = {
+    "fr": """le la les un une des du de et en à au aux pour par sur dans avec vous nous votre vos notre nos
+        est sont être avoir sera ce cette ces qui que qu il elle ils leur leurs ou où mais plus son sa ses
+        pas ne se une poste équipe expérience entreprise profil missions rejoindre""",
+    "en": """the and of to a an in for with on at by from is are be will you your we our this that these
+        those as or it its who which have has not but all can their they team experience company role
+        join skills work""",
+    "de": """der die das und ist sind ein eine einen einem einer zu mit für von auf im in den dem des sie
+        wir ihr ihre unser unsere bei als auch oder nicht sich werden wird aus nach über du dein deine
+        team erfahrung unternehmen aufgaben""",
+    "es": """el la los las un una unos unas y de del en con para por que es son se su sus al lo como más
+        o pero muy nuestro nuestra nuestros tu tus usted equipo experiencia empresa puesto buscamos
+        trabajo""",
+    "it": """il lo la i gli le un una uno e di del della dei delle in con per da su che è sono si suo sua
+        al alla nel nella come più o ma non nostro nostra tuo tua esperienza azienda squadra lavoro
+        ricerchiamo""",
+    "pt": """o a os as um uma e de do da dos das em no na nos nas com para por que é são se seu sua ao à
+        como mais ou mas não nosso nossa você equipe equipa experiência empresa vaga trabalho""",
+    "nl": """de het een en van in op met voor te is zijn je jij jouw wij we ons onze bij als ook of niet
+        dat die dit door naar uit aan om er wordt worden team ervaring bedrijf functie werk""",
+}
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+_WEIGHTS = {}
+for _language, _words in _PROFILES.items():
+    for _word in set(_words.split()):
+        _WEIGHTS.setdefault(_word, []).append(_language)
+_WEIGHTS = {word: (tuple(languages), 1 / len(languages)) for word, languages in _WEIGHTS.items()}
+
+STOPWORDS = frozenset(_WEIGHTS)
+MIN_EVIDENCE = 8.0
+
+
+def detect(text: str, max_chars: int = 2000) -> tuple[str, float]:
+    scores = dict.fromkeys(_PROFILES, 0.0)
+    for word in _WORD.findall(text[:max_chars].lower()):
+        entry = _WEIGHTS.get(word)
+        if entry:
+            languages, weight = entry
+            for language in languages:
+                scores[language] += weight
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best, best_score), (_, second_score) = ranked[0], ranked[1]
+    if not best_score:
+        return "", 0.0
+    margin = (best_score - second_score) / best_score
+    evidence = min(1.0, best_score / MIN_EVIDENCE)
+    return best, round(margin * evidence, 3)
+
+
+def get_threshold() -> float:
+    return float(os.getenv("LANGUAGE_CONFIDENCE", "0.5"))
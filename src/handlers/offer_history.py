@@ -0,0 +1,147 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from handlers.cache import get_cache_dir
+from handlers.url_utils import url_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS offers (
+    key TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    offer_id TEXT,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    company TEXT,
+    location TEXT,
+    posted_at TEXT,
+    snippet TEXT,
+    search TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS offers_posted_at ON offers(COALESCE(posted_at, first_seen));
+CREATE INDEX IF NOT EXISTS offers_source ON offers(source, COALESCE(posted_at, first_seen));
+CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5(
+    title, company, location, content='offers', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS offers_ai AFTER INSERT ON offers BEGIN
+    INSERT INTO offers_fts(rowid, title, company, location) VALUES (new.rowid, new.title, new.company, new.location);
+END;
+CREATE TRIGGER IF NOT EXISTS offers_ad AFTER DELETE ON offers BEGIN
+    INSERT INTO offers_fts(offers_fts, rowid, title, company, location)
+    VALUES ('delete', old.rowid, old.title, old.company, old.location);
+END;
+CREATE TRIGGER IF NOT EXISTS offers_au AFTER UPDATE OF title, company, location ON offers BEGIN
+    INSERT INTO offers_fts(offers_fts, rowid, title, company, location)
+    VALUES ('delete', old.rowid, old.title, old.company, old.location);
+    INSERT INTO offers_fts(rowid, title, company, location) VALUES (new.rowid, new.title, new.company, new.location);
+END;
+"""
+
+UPSERT = """
+INSERT INTO offers (key, source, offer_id, url, title, company, location, posted_at, snippet, search, first_seen, last_seen)
+VALUES (:key, :source, :offer_id, :url, :title, :company, :location, :posted_at, :snippet, :search, :seen, :seen)
+ON CONFLICT(key) DO UPDATE SET
+    title = excluded.title,
+    company = excluded.company,
+    location = excluded.location,
+    posted_at = COALESCE(excluded.posted_at, offers.posted_at),
+    snippet = COALESCE(NULLIF(excluded.snippet, ''), offers.snippet),
+    search = excluded.search,
+    last_seen = excluded.last_seen
+"""
+
+_lock = threading.Lock()
+_TERM = re.compile(r"\w+")
+
+
+def get_history_file() -> Path:
+    return Path(os.getenv("OFFER_HISTORY") or get_cache_dir() / "offers.sqlite")
+
+
+def connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(get_history_file())
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_offers(offers: list, search: str = "") -> int:
+    seen = datetime.now().isoformat(timespec="seconds")
+    rows = []
+    for offer in offers:
+        key = url_key(offer.url)
+        if not key:
+            continue
+        rows.append({
+            "key": key,
+            "source": offer.source,
+            "offer_id": offer.id,
+            "url": offer.url,
+            "title": offer.title,
+            "company": offer.company,
+            "location": offer.location,
+            "posted_at": offer.posted_at.isoformat() if offer.posted_at else None,
+            "snippet": getattr(offer, "snippet", "") or "",
+            "search": search,
+            "seen": seen,
+        })
+    if not rows:
+        return 0
+    with _lock:
+        conn = connect()
+        try:
+            with conn:
+                conn.executemany(UPSERT, rows)
+        finally:
+            conn.close()
+    return len(rows)
+
+
+def to_match_query(text: str) -> str:
+    # Every word of the query must match, as a prefix, so "contro lyon" finds
+    # "Contrôleur de gestion" in Lyon; quoting keeps FTS5 operators out of user input.
+    return " ".join(f'"{term}"*' for term in _TERM.findall(text))
+
+
+def search_offers(query: str = "", source: str = None, since: str = None, limit: int = 50) -> list[dict]:
+    clauses, params = [], []
+    if query.strip():
+        clauses.append("offers.rowid IN (SELECT rowid FROM offers_fts WHERE offers_fts MATCH ?)")
+        params.append(to_match_query(query))
+    if source:
+        clauses.append("offers.source = ?")
+        params.append(source)
+    if since:
+        clauses.append("COALESCE(offers.posted_at, offers.first_seen) >= ?")
+        params.append(since)
+
+    sql = "SELECT * FROM offers"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY COALESCE(offers.posted_at, offers.first_seen) DESC LIMIT ?"
+    params.append(limit)
+
+    conn = connect()
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def row_to_entry(row: dict) -> dict:
+    return {
+        'url': row['url'],
+        'company': row['company'] or '',
+        'position': row['title'] or '',
+        'location': row['location'] or '',
+        'source': row['source'] or '',
+        'posted_at': (row['posted_at'] or '')[:10],
+    }
@@ -0,0 +1,74 @@
+import os
+import re
+import math
+import unicodedata
+from pathlib import Path
+
+from handlers.docx_patch import read_document_text
+from handlers.language_detect import STOPWORDS
+
+_TOKEN = re.compile(r"[a-z0-9]{2,}")
+STEM_LENGTH = 6
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+_STOPWORDS = frozenset(_strip_accents(word) for word in STOPWORDS)
+
+
+def tokenize(text: str) -> list[str]:
+    # Truncating to a 6-character prefix is a crude, language-agnostic stemmer:
+    # "contrôleur"/"contrôle" and "finance"/"financier" end up on the same term.
+    return [t[:STEM_LENGTH] for t in _TOKEN.findall(_strip_accents(text.lower())) if t not in _STOPWORDS]
+
+
+def offer_text(job) -> str:
+    # The title is the most telling field, so it counts twice.
+    return " ".join([job.title, job.title, job.company, job.location, getattr(job, "snippet", "") or ""])
+
+
+def get_profile_text() -> str:
+    template_cv = Path(os.getenv("TEMPLATE_CV", "Template/CV.docx"))
+    parts = [os.getenv("CV_HEADER_TEMPLATE", "")]
+    if template_cv.exists():
+        parts.append(read_document_text(template_cv))
+    return "\n".join(parts).strip()
+
+
+def score_texts(documents: list[str], query: str):
+    # TF-IDF cosine similarity of each document with the query, with sublinear term
+    # frequencies and idf computed over the documents plus the query.
+    import numpy as np
+
+    tokenized = [tokenize(d) for d in documents] + [tokenize(query)]
+    vocabulary = {}
+    rows, cols = [], []
+    for row, tokens in enumerate(tokenized):
+        for token in tokens:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+    if not vocabulary:
+        return np.zeros(len(documents))
+
+    counts = np.zeros((len(tokenized), len(vocabulary)), dtype=np.float32)
+    np.add.at(counts, (np.array(rows), np.array(cols)), 1)
+
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(tokenized)) / (1 + df)) + 1
+    weights = np.log1p(counts) * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    weights /= np.where(norms == 0, 1, norms)
+    return weights[:-1] @ weights[-1]
+
+
+def rank_offers(offers: list, profile: str) -> list[tuple[object, float]]:
+    if not offers or not profile:
+        return [(offer, math.nan) for offer in offers]
+
+    import numpy as np
+
+    scores = score_texts([offer_text(offer) for offer in offers], profile)
+    order = np.argsort(-scores, kind="stable")
+    return [(offers[i], float(scores[i])) for i in order]
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+import functools
+from pathlib import Path
+from contextlib import contextmanager, nullcontext
+
+_enabled = False
+_profiling = False
+_profiles = []
+_events = []
+_events_lock = threading.Lock()
+_pid = os.getpid()
+_NULL_SPAN = nullcontext()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+@contextmanager
+def _record(name: str, args: dict):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": (end - start) / 1000,
+            "pid": _pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = {k: str(v) for k, v in args.items()}
+        with _events_lock:
+            _events.append(event)
+
+
+def span(name: str, **args):
+    if not _enabled:
+        return _NULL_SPAN
+    return _record(name, args)
+
+
+def traced(name: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _record(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def export_chrome_trace(path: Path):
+    with _events_lock:
+        events = list(_events)
+    tids = {e["tid"] for e in events}
+    thread_names = [
+        {"name": "thread_name", "ph": "M", "pid": _pid, "tid": t.ident, "args": {"name": t.name}}
+        for t in threading.enumerate() if t.ident in tids
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": thread_names + events, "displayTimeUnit": "ms"}, f)
+
+
+@contextmanager
+def profile_task():
+    # cProfile only sees the thread that enables it, so each posting run on a worker
+    # thread gets its own profiler, merged into the session's dump at the end.
+    if not _profiling:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler already covers this code (Python 3.12+ profiles all threads).
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        with _events_lock:
+            _profiles.append(profiler)
+
+
+def profiled(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with profile_task():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _dump_profiles(profiler: cProfile.Profile, path: str):
+    with _events_lock:
+        profiles = list(_profiles)
+        _profiles.clear()
+    stats = pstats.Stats(profiler)
+    for task_profiler in profiles:
+        stats.add(task_profiler)
+    stats.dump_stats(path)
+
+
+@contextmanager
+def session():
+    global _profiling
+    trace_file = os.getenv("TRACE_FILE")
+    profile_file = os.getenv("PROFILE_FILE")
+    profiler = cProfile.Profile() if profile_file else None
+
+    if trace_file:
+        enable()
+    if profiler:
+        profiler.enable()
+        _profiling = True
+    try:
+        yield
+    finally:
+        if profiler:
+            _profiling = False
+            profiler.disable()
+            _dump_profiles(profiler, profile_file)
+            print(f"Profile written to {profile_file}")
+        if trace_file:
+            export_chrome_trace(Path(trace_file))
+            disable()
+            print(f"Trace written to {trace_file}")
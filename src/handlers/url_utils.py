@@ -0,0 +1,61 @@
+import re
+import hashlib
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid"}
+
+# Generic names like "position" or "source" can be real parameters elsewhere, so they
+# are only dropped on the job boards known to use them for tracking.
+HOST_TRACKING_PARAMS = [
+    ("linkedin.com", {"refid", "trackingid", "trk", "trkinfo", "position", "pagenum", "lipi"}),
+    ("indeed.", {"from", "src", "source"}),
+    ("hellowork.com", {"from", "src", "source"}),
+    ("welcometothejungle.com", {"from", "src", "source"}),
+    ("francetravail.fr", {"from", "src", "source"}),
+    ("pole-emploi.fr", {"from", "src", "source"}),
+    ("adzuna.", {"from", "src", "source"}),
+]
+
+SOURCE_PATTERNS = [
+    ("linkedin", "linkedin.com", [r"/jobs/view/(?:[^/?#]*-)?(\d+)", r"[?&]currentJobId=(\d+)"]),
+    ("francetravail", "francetravail.fr", [r"/detail/([A-Z0-9]+)"]),
+    ("francetravail", "pole-emploi.fr", [r"/detail/([A-Z0-9]+)"]),
+    ("hellowork", "hellowork.com", [r"/emplois/(\d+)\.html"]),
+    ("wttj", "welcometothejungle.com", [r"/companies/([^/?#]+)/jobs/([^/?#]+)"]),
+    ("adzuna", "adzuna.", [r"/(?:details|land/ad)/(\d+)"]),
+]
+
+
+def canonicalize_url(url: str) -> str:
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if "://" not in url:
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+    host = parts.netloc.lower().split("@")[-1].split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+
+    for source, domain, patterns in SOURCE_PATTERNS:
+        if domain not in host:
+            continue
+        target = f"{parts.path}?{parts.query}"
+        for pattern in patterns:
+            match = re.search(pattern, target)
+            if match:
+                return f"{source}:{'/'.join(g.lower() if source == 'wttj' else g for g in match.groups())}"
+
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    tracking = TRACKING_PARAMS.union(*(params for domain, params in HOST_TRACKING_PARAMS if domain in host))
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in tracking and not k.lower().startswith("utm_")
+    )
+    return f"{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+
+def url_key(url: str) -> str:
+    canonical = canonicalize_url(url)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=12).hexdigest() if canonical else ""
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import ctypes
+import select
+import struct
+from pathlib import Path
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+# Only complete files: a file being written wakes us once it is closed or moved in.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO
+
+_EVENT = struct.Struct("iIII")
+
+
+class Watcher:
+    def __init__(self, directories: list[Path], poll_interval: float = 1.0):
+        self.directories = [Path(d) for d in directories]
+        self.poll_interval = poll_interval
+        self._fd = self._init_inotify()
+        self._snapshot = None if self._fd is not None else self._scan()
+
+    def _init_inotify(self):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            for directory in self.directories:
+                if libc.inotify_add_watch(fd, str(directory).encode(), WATCH_MASK) < 0:
+                    os.close(fd)
+                    return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _scan(self) -> dict:
+        snapshot = {}
+        for directory in self.directories:
+            try:
+                for entry in os.scandir(directory):
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                continue
+        return snapshot
+
+    def wait(self, timeout: float) -> list[str]:
+        if self._fd is not None:
+            ready, _, _ = select.select([self._fd], [], [], timeout)
+            if not ready:
+                return []
+            return self._read_events()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = [path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)]
+            self._snapshot = snapshot
+            if changed:
+                return [os.path.basename(path) for path in changed]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(self.poll_interval, remaining))
+
+    def _read_events(self) -> list[str]:
+        names = []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            names.append(os.fsdecode(name))
+            offset += _EVENT.size + length
+        return names
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
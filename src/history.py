@@ -0,0 +1,44 @@
+import re
+import sys
+import argparse
+from datetime import datetime, timedelta
+
+from handlers.csv_handler import add_csv_entries
+from handlers.offer_history import row_to_entry, search_offers
+
+
+def parse_since(value: str) -> str:
+    match = re.fullmatch(r"(\d+)([dw])", value)
+    if match:
+        days = int(match.group(1)) * (7 if match.group(2) == "w" else 1)
+        return (datetime.now() - timedelta(days=days)).date().isoformat()
+    try:
+        return datetime.fromisoformat(value).date().isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date (YYYY-MM-DD) or a duration like 7d or 2w, got {value!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search every offer seen by the scrapers, offline")
+    parser.add_argument("query", nargs="*", help="Words to find in the title, company or location (prefixes match)")
+    parser.add_argument("--source", help="Only offers from this source (adzuna, francetravail, hellowork, linkedin, wttj)")
+    parser.add_argument("--since", type=parse_since, help="Only offers posted (or first seen) since a date or e.g. 7d")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--add", action="store_true", help="Add the offers found to the tracker")
+    args = parser.parse_args(argv)
+
+    rows = search_offers(" ".join(args.query), args.source, args.since, args.limit)
+    for row in rows:
+        posted = (row["posted_at"] or row["first_seen"])[:10]
+        print(f"{posted}  {row['source']:<13} {row['title']} @ {row['company']} ({row['location']})\n"
+              f"{'':<12}{row['url']}")
+    print(f"\n{len(rows)} offer(s) found")
+
+    if args.add and rows:
+        added = add_csv_entries([row_to_entry(row) for row in rows])
+        print(f"Added {added} job(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
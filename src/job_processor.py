@@ -1,19 +1,52 @@
 import os
 from datetime import datetime
 from pathlib import Path
-from docx import Document
 
 from handlers.ai_handler import (
-    detect_language, get_cover_letter_label, get_company_name,
-    get_position_title, get_job_location, get_cv_updates,
-    get_new_cover_letter_paragraphs, generate_email_body, get_email_subject
+    detect_language, get_company_name, get_position_title, get_job_location, get_cv_updates
+)
+from handlers import artifact_store, batch_handler
+from handlers.checkpoint import Checkpoint, load_checkpoint
+from handlers.docx_patch import read_paragraph_texts
+from handlers.document_handler import (
+    build_cover_letter_paragraphs, fill_cv_header, get_cover_letter_slots, get_cv_header_slots, modify_cv_header,
+    modify_cover_letter,
 )
-from handlers.document_handler import modify_cv_header, modify_cover_letter
 from handlers.email_handler import create_eml_file
-from handlers.file_utils import get_unique_filename, convert_to_pdf
+from handlers.email_templates import get_cover_letter_label, generate_email_body, get_email_subject
+from handlers.file_utils import get_unique_filename, release_filename, convert_to_pdf
+from handlers.tracing import span
+
+
+# Scrapers fill a missing company or location with these defaults; they are not real values.
+PLACEHOLDER_VALUES = {"", "non spécifié", "entreprise confidentielle", "france", "unknown", "not specified", "n/a"}
+KNOWN_FIELDS = ("company", "position", "location")
+
+
+def seed_known_fields(checkpoint: Checkpoint, known: dict):
+    for field in KNOWN_FIELDS:
+        value = (known.get(field) or "").strip()
+        if value.casefold() not in PLACEHOLDER_VALUES:
+            checkpoint.value(field, lambda: value)
+
+
+def _cv_header_text(cv_updates: dict) -> str:
+    # The header actually written decides the CV, whatever slots produced it.
+    header_template = os.getenv("CV_HEADER_TEMPLATE", "")
+    if not header_template:
+        return ""
+    return fill_cv_header(header_template, get_cv_header_slots(header_template), cv_updates)
+
+
+def _new_file_artifact(checkpoint: Checkpoint, stage: str, base_path: Path, build) -> Path:
+    def build_and_release(path: Path):
+        build(path)
+        release_filename(path)
 
+    return checkpoint.artifact(stage, lambda: get_unique_filename(base_path), build_and_release)
 
-def process_job_posting(job_posting: str, url: str = None) -> dict:
+
+def process_job_posting(job_posting: str, url: str = None, checkpoint: Checkpoint = None, known: dict = None) -> dict:
     template_cv = Path(os.getenv("TEMPLATE_CV", "Template/CV.docx"))
     template_cl = Path(os.getenv("TEMPLATE_COVER_LETTER", "Template/Cover Letter.docx"))
     output_base = Path(os.getenv("OUTPUT_BASE_DIR", "."))
@@ -22,15 +55,26 @@ def process_job_posting(job_posting: str, url: str = None) -> dict:
         print("Error: Template cover letter not found")
         return {}
 
-    doc = Document(template_cl)
-    candidate_name = doc.paragraphs[0].text.strip()
+    checkpoint = checkpoint or load_checkpoint(url, job_posting)
+    if checkpoint.resumed:
+        print("Resuming from checkpoint")
+    if known:
+        seed_known_fields(checkpoint, known)
+
+    with span("template.load"):
+        candidate_name = read_paragraph_texts(template_cl)[0].strip()
 
-    language = detect_language(job_posting)
-    cover_letter_label = get_cover_letter_label(language)
+    with span("llm.detect_language"):
+        language = checkpoint.value("language", lambda: detect_language(job_posting))
+    with span("llm.cover_letter_label"):
+        cover_letter_label = checkpoint.value("cover_letter_label", lambda: get_cover_letter_label(language))
 
-    company_name = get_company_name(job_posting)
-    position_title = get_position_title(job_posting)
-    job_location = get_job_location(job_posting)
+    with span("llm.company_name"):
+        company_name = checkpoint.value("company", lambda: get_company_name(job_posting))
+    with span("llm.position_title"):
+        position_title = checkpoint.value("position", lambda: get_position_title(job_posting))
+    with span("llm.job_location"):
+        job_location = checkpoint.value("location", lambda: get_job_location(job_posting))
 
     print(f"Company: {company_name}, Position: {position_title}, Location: {job_location}, Language: {language}")
 
@@ -38,39 +82,136 @@ def process_job_posting(job_posting: str, url: str = None) -> dict:
     company_dir.mkdir(exist_ok=True, parents=True)
 
     print("Getting CV updates...")
-    cv_updates = get_cv_updates(job_posting, language)
+    with span("llm.cv_updates"):
+        cv_updates = checkpoint.value("cv_updates", lambda: get_cv_updates(job_posting, language))
 
     print("Generating cover letter...")
-    new_paragraphs = get_new_cover_letter_paragraphs(job_posting, company_name, template_cl, language)
-
-    output_cl_docx = get_unique_filename(company_dir / f"{candidate_name} {cover_letter_label}.docx")
-    modify_cover_letter(template_cl, output_cl_docx, new_paragraphs)
-
-    output_cl_pdf = output_cl_docx.with_suffix('.pdf')
-    convert_to_pdf(output_cl_docx, output_cl_pdf)
+    with span("llm.cover_letter_paragraphs"):
+        new_paragraphs = checkpoint.value(
+            "paragraphs", lambda: build_cover_letter_paragraphs(job_posting, company_name, template_cl, language)
+        )
+
+    output_cl_docx = _new_file_artifact(
+        checkpoint, "cl_docx", company_dir / f"{candidate_name} {cover_letter_label}.docx",
+        lambda path: modify_cover_letter(template_cl, path, new_paragraphs),
+    )
+
+    output_cl_pdf = checkpoint.artifact(
+        "cl_pdf",
+        lambda: output_cl_docx.with_suffix('.pdf'),
+        # Each letter is unique, so its PDF is never looked up in the artifact store.
+        lambda path: convert_to_pdf(output_cl_docx, path),
+    )
 
     if template_cv.exists():
-        output_cv_docx = get_unique_filename(company_dir / f"{candidate_name} CV.docx")
-        modify_cv_header(template_cv, output_cv_docx, cv_updates)
+        output_cv_docx = _new_file_artifact(
+            checkpoint, "cv_docx", company_dir / f"{candidate_name} CV.docx",
+            lambda path: artifact_store.build_or_reuse(
+                path, lambda: modify_cv_header(template_cv, path, cv_updates),
+                "cv", artifact_store.file_hash(template_cv), _cv_header_text(cv_updates),
+            ),
+        )
+
+        def build_cv_pdf(path: Path):
+            if artifact_store.convert_or_reuse(output_cv_docx, path, convert_to_pdf):
+                print("Reused cached CV PDF")
 
-        output_cv_pdf = output_cv_docx.with_suffix('.pdf')
-        convert_to_pdf(output_cv_docx, output_cv_pdf)
+        output_cv_pdf = checkpoint.artifact("cv_pdf", lambda: output_cv_docx.with_suffix('.pdf'), build_cv_pdf)
 
         print("Generating email...")
-        email_body = generate_email_body(company_name, position_title, language, template_cl)
-        email_subject = get_email_subject(position_title, cv_updates.get("job_field", ""), candidate_name, language)
-        output_eml = get_unique_filename(company_dir / f"{candidate_name} Email.eml")
-        create_eml_file(output_eml, email_body, output_cv_pdf, output_cl_pdf, email_subject)
+        with span("llm.email_body"):
+            email_body = checkpoint.value(
+                "email_body", lambda: generate_email_body(company_name, position_title, language, template_cl)
+            )
+        with span("llm.email_subject"):
+            email_subject = checkpoint.value(
+                "email_subject",
+                lambda: get_email_subject(position_title, cv_updates.get("job_field", ""), candidate_name, language),
+            )
+        output_eml = _new_file_artifact(
+            checkpoint, "eml", company_dir / f"{candidate_name} Email.eml",
+            lambda path: create_eml_file(path, email_body, output_cv_pdf, output_cl_pdf, email_subject),
+        )
 
         print(f"Files: {output_cl_docx.name}, {output_cl_pdf.name}, {output_cv_docx.name}, {output_cv_pdf.name}, {output_eml.name}\n")
     else:
+        output_eml = None
         print(f"Files: {output_cl_docx.name}, {output_cl_pdf.name}\n")
 
+    artifacts = [output_cl_docx, output_cl_pdf]
+    if output_eml:
+        artifacts += [output_cv_docx, output_cv_pdf, output_eml]
+
+    checkpoint.clear()
     return {
+        'eml_path': str(output_eml) if output_eml else '',
+        'artifacts': [str(path) for path in artifacts if path.exists()],
         'company': company_name,
         'position': position_title,
         'location': job_location,
         'language': language,
         'date_processed': datetime.now().strftime("%Y-%m-%d %H:%M"),
         'status': 'done'
-    }
\ No newline at end of file
+    }
+
+
+def _llm_stages(job_posting: str, template_cl: Path, candidate_name: str, with_email: bool) -> list:
+    stages = [
+        ("language", (), lambda v: detect_language(job_posting)),
+        ("company", (), lambda v: get_company_name(job_posting)),
+        ("position", (), lambda v: get_position_title(job_posting)),
+        ("location", (), lambda v: get_job_location(job_posting)),
+        ("cover_letter_label", ("language",), lambda v: get_cover_letter_label(v["language"])),
+        ("cv_updates", ("language",), lambda v: get_cv_updates(job_posting, v["language"])),
+        ("paragraphs", ("company", "language"),
+         lambda v: build_cover_letter_paragraphs(job_posting, v["company"], template_cl, v["language"])),
+    ]
+    if with_email:
+        stages += [
+            ("email_body", ("company", "position", "language"),
+             lambda v: generate_email_body(v["company"], v["position"], v["language"], template_cl)),
+            ("email_subject", ("position", "cv_updates", "language"),
+             lambda v: get_email_subject(v["position"], v["cv_updates"].get("job_field", ""), candidate_name, v["language"])),
+        ]
+    return stages
+
+
+def prefetch_llm_stages(postings: list[tuple[str, Checkpoint]], max_rounds: int = 6):
+    template_cv = Path(os.getenv("TEMPLATE_CV", "Template/CV.docx"))
+    template_cl = Path(os.getenv("TEMPLATE_COVER_LETTER", "Template/Cover Letter.docx"))
+    if not template_cl.exists():
+        return
+
+    candidate_name = read_paragraph_texts(template_cl)[0].strip()
+    header_template = os.getenv("CV_HEADER_TEMPLATE", "")
+
+    batch_handler.start_collecting()
+    try:
+        for round_number in range(1, max_rounds + 1):
+            if header_template and template_cv.exists():
+                try:
+                    get_cv_header_slots(header_template)
+                except batch_handler.BatchPending:
+                    pass
+            try:
+                get_cover_letter_slots(template_cl)
+            except batch_handler.BatchPending:
+                pass
+
+            for job_posting, checkpoint in postings:
+                for stage, needs, compute in _llm_stages(job_posting, template_cl, candidate_name, template_cv.exists()):
+                    if stage in checkpoint.data or any(n not in checkpoint.data for n in needs):
+                        continue
+                    try:
+                        checkpoint.value(stage, lambda: compute(checkpoint.data))
+                    except batch_handler.BatchPending:
+                        pass
+
+            if not batch_handler.pending_count():
+                break
+            print(f"Batch round {round_number}: {batch_handler.pending_count()} request(s)")
+            with span("llm.batch"):
+                batch_handler.submit_and_wait()
+    finally:
+        batch_handler.stop_collecting()
+    batch_handler.clear_results()
@@ -1,36 +1,41 @@
+import os
 from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from handlers.csv_handler import read_csv_entries, update_csv_entry
+from handlers.csv_handler import pending_entries, read_csv_entries, update_csv_entry
 from handlers.file_utils import fetch_job_posting_from_url
+from handlers import tracing
+from handlers.checkpoint import load_checkpoint
 from job_processor import process_job_posting
 
 
-def main():
-    entries = read_csv_entries()
-    pending = [e for e in entries
-               if (e.get('status') or '').lower() != 'done'
-               and (e.get('url') or '').strip()]
+def process_url(url: str, position: str = "", known: dict = None) -> dict:
+    with tracing.span("posting", url=url):
+        checkpoint = load_checkpoint(url)
+        print(f"{position}Fetching: {url}")
+        with tracing.span("fetch"):
+            job_posting = checkpoint.data.get("posting") or fetch_job_posting_from_url(url)
+        if not job_posting:
+            print(f"Skipped: Failed to fetch {url}\n")
+            return {'status': 'fetch_failed', 'date_processed': datetime.now().strftime("%Y-%m-%d %H:%M")}
+        checkpoint.value("posting", lambda: job_posting)
+        return process_job_posting(job_posting, url, checkpoint, known)
 
-    if pending:
-        print(f"Found {len(pending)} pending URL(s)\n")
 
-        for i, entry in enumerate(pending, 1):
-            url = (entry.get('url') or '').strip()
-            if not url:
-                continue
+def main(workers: int = None, interactive: bool = True):
+    if os.getenv("DAEMON_MODE", "0") == "1":
+        from daemon import run
+        return run(workers)
+    if os.getenv("API_MODE", "0") == "1":
+        from api import run
+        return run(workers)
 
-            print(f"[{i}/{len(pending)}] Fetching: {url}")
-            job_posting = fetch_job_posting_from_url(url)
+    with tracing.session():
+        process_pending(workers)
 
-            if job_posting:
-                metadata = process_job_posting(job_posting, url)
-                if metadata:
-                    update_csv_entry(url, metadata)
-            else:
-                print(f"Skipped: Failed to fetch {url}\n")
-                update_csv_entry(url, {'status': 'fetch_failed', 'date_processed': datetime.now().strftime("%Y-%m-%d %H:%M")})
-    else:
-        print("No pending URLs in list.csv")
+    if not interactive:
+        return
 
     search = input("\nSearch for jobs? [y/N]: ").strip().lower()
     if search == 'y':
@@ -38,5 +43,84 @@ def main():
         search_main()
 
 
+def process_pending(workers: int = None):
+    workers = max(1, workers or int(os.getenv("WORKERS", "1")))
+    entries = pending_entries(read_csv_entries())
+    pending = [e['url'].strip() for e in entries]
+
+    if pending:
+        print(f"Found {len(pending)} pending URL(s)\n")
+
+        if os.getenv("BATCH_MODE", "0") == "1":
+            prefetch_batch(pending, entries)
+
+        eml_paths = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(tracing.profiled(process_url), url, f"[{i}/{len(pending)}] ", entry): url
+                for i, (url, entry) in enumerate(zip(pending, entries), 1)
+            }
+            # Each posting updates the tracker as soon as it finishes, so one failure
+            # doesn't lose the results of the others.
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    metadata = future.result()
+                except Exception as e:
+                    print(f"Failed: {url}: {e}\n")
+                    metadata = {'status': 'failed', 'notes': str(e)[:200],
+                                'date_processed': datetime.now().strftime("%Y-%m-%d %H:%M")}
+                if metadata:
+                    with tracing.span("tracker.update"):
+                        update_csv_entry(url, metadata)
+                    if metadata.get('eml_path'):
+                        eml_paths.append(Path(metadata['eml_path']))
+
+        export_drafts(eml_paths)
+        report_llm_usage()
+    else:
+        print("No pending URLs in list.csv")
+
+
+def prefetch_batch(urls: list[str], known: list[dict]):
+    from job_processor import prefetch_llm_stages, seed_known_fields
+
+    postings = []
+    for url, entry in zip(urls, known):
+        checkpoint = load_checkpoint(url)
+        seed_known_fields(checkpoint, entry)
+        with tracing.span("fetch"):
+            job_posting = checkpoint.data.get("posting") or fetch_job_posting_from_url(url)
+        if job_posting:
+            checkpoint.value("posting", lambda: job_posting)
+            postings.append((job_posting, checkpoint))
+
+    print(f"Preparing {len(postings)} posting(s) through the batch API\n")
+    prefetch_llm_stages(postings)
+
+
+def report_llm_usage():
+    from handlers.ai_handler import get_usage
+
+    usage = get_usage()
+    if not usage["prompt_tokens"]:
+        return
+    share = usage["cached_tokens"] / usage["prompt_tokens"]
+    print(f"LLM input: {usage['prompt_tokens']} prompt tokens over {usage['requests']} request(s), "
+          f"{usage['cached_tokens']} served from the prompt cache ({share:.0%})")
+
+
+def export_drafts(eml_paths: list[Path]):
+    destination = os.getenv("MAILBOX_EXPORT")
+    if not destination or not eml_paths:
+        return
+    from handlers.email_handler import export_mailbox
+
+    mailbox_format = os.getenv("MAILBOX_FORMAT", "mbox").lower()
+    with tracing.span("eml.export_mailbox"):
+        exported = export_mailbox(eml_paths, Path(destination), mailbox_format)
+    print(f"Exported {exported} draft(s) to {destination} ({mailbox_format})")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,4 +1,8 @@
 import os
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Iterator, Optional
 from dataclasses import dataclass
@@ -15,6 +19,7 @@ class JobOffer:
     company: str
     location: str
     posted_at: Optional[datetime] = None
+    snippet: str = ""
 
 
 @dataclass
@@ -35,36 +40,57 @@ class AdzunaScraper:
         self.app_key = os.getenv("ADZUNA_APP_KEY")
         if not self.app_id or not self.app_key:
             raise ValueError("Missing ADZUNA_APP_ID or ADZUNA_APP_KEY")
+        self.max_workers = 4
+        self.min_interval = 0.25
+        self._rate_lock = threading.Lock()
+        self._last_request = 0.0
 
     def search(self, criteria: SearchCriteria) -> Iterator[JobOffer]:
-        page = 1
         jobs_found = 0
         seen_ids = set()
-        results_per_page = 50
-
-        while jobs_found < criteria.max_results:
-            url = self._build_search_url(criteria, page, results_per_page)
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            results = data.get("results", [])
-            if not results:
-                break
-
-            for result in results:
-                if jobs_found >= criteria.max_results:
+        results_per_page = max(1, min(criteria.max_results, 50))
+
+        data = self._fetch_page(criteria, 1, results_per_page)
+        total_pages = math.ceil(data.get("count", 0) / results_per_page)
+        pages = iter([data])
+        next_page = 2
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                exhausted = False
+                for data in pages:
+                    results = data.get("results", [])
+                    if not results:
+                        exhausted = True
+                        break
+
+                    for result in results:
+                        if jobs_found >= criteria.max_results:
+                            break
+
+                        job = self._parse_result(result)
+                        if job and job.id not in seen_ids:
+                            seen_ids.add(job.id)
+                            jobs_found += 1
+                            yield job
+
+                if exhausted or jobs_found >= criteria.max_results or next_page > total_pages:
                     break
 
-                job = self._parse_result(result)
-                if job and job.id not in seen_ids:
-                    seen_ids.add(job.id)
-                    jobs_found += 1
-                    yield job
-
-            total_count = data.get("count", 0)
-            if page * results_per_page >= total_count:
-                break
-            page += 1
+                pages_needed = math.ceil((criteria.max_results - jobs_found) / results_per_page)
+                batch = range(next_page, min(next_page + pages_needed, total_pages + 1))
+                next_page = batch.stop
+                pages = executor.map(lambda p: self._fetch_page(criteria, p, results_per_page), batch)
+
+    def _fetch_page(self, criteria: SearchCriteria, page: int, results_per_page: int) -> dict:
+        with self._rate_lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+        response = requests.get(self._build_search_url(criteria, page, results_per_page), timeout=30)
+        response.raise_for_status()
+        return response.json()
 
     def _build_search_url(self, criteria: SearchCriteria, page: int, results_per_page: int) -> str:
         base = f"{self.base_url}/{criteria.country}/search/{page}"
@@ -100,6 +126,7 @@ class AdzunaScraper:
                 company=result.get("company", {}).get("display_name", "").strip(),
                 location=result.get("location", {}).get("display_name", "").strip() or "France",
                 posted_at=posted_at,
+                snippet=(result.get("description") or "").strip(),
             )
         except Exception:
             return None
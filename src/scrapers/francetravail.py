@@ -1,6 +1,7 @@
 import os
 import re
 import time
+import threading
 from datetime import datetime
 from typing import Iterator, Optional
 from dataclasses import dataclass
@@ -19,6 +20,7 @@ class JobOffer:
     company: str
     location: str
     posted_at: Optional[datetime] = None
+    snippet: str = ""
 
 
 @dataclass
@@ -133,9 +135,184 @@ class FranceTravailScraper:
         )
 
 
+class FranceTravailAPIScraper:
+    detail_url = "https://candidat.francetravail.fr/offres/recherche/detail"
+    name = "francetravail"
+    scope = "api_offresdemploiv2 o2dsoffre"
+
+    MAX_RANGE = 150
+    MAX_START = 3000
+
+    _token_cache: dict[str, tuple[str, float]] = {}
+    _token_lock = threading.Lock()
+    _insee_codes: dict[str, str] = {}
+    _insee_loaded = False
+    _insee_lock = threading.Lock()
+
+    def __init__(self):
+        self.client_id = os.getenv("FRANCE_TRAVAIL_CLIENT_ID")
+        self.client_secret = os.getenv("FRANCE_TRAVAIL_CLIENT_SECRET")
+        if not self.client_id or not self.client_secret:
+            raise ValueError("Missing FRANCE_TRAVAIL_CLIENT_ID or FRANCE_TRAVAIL_CLIENT_SECRET")
+        self.api_url = os.getenv("FRANCE_TRAVAIL_API_URL", "https://api.francetravail.io/partenaire/offresdemploi/v2")
+        self.token_url = os.getenv(
+            "FRANCE_TRAVAIL_TOKEN_URL",
+            "https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm=%2Fpartenaire",
+        )
+        self.session = requests.Session()
+
+    def _get_token(self) -> str:
+        with self._token_lock:
+            cached = self._token_cache.get(self.client_id)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+
+            response = self.session.post(self.token_url, data={
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "scope": self.scope,
+            }, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+            token = data["access_token"]
+            expires_in = int(data.get("expires_in", 1499))
+            self._token_cache[self.client_id] = (token, time.monotonic() + max(expires_in - 60, 0))
+            return token
+
+    def _get(self, path: str, params: dict = None):
+        for attempt in range(2):
+            response = self.session.get(
+                f"{self.api_url}{path}",
+                params=params,
+                headers={"Authorization": f"Bearer {self._get_token()}", "Accept": "application/json"},
+                timeout=30,
+            )
+            if response.status_code == 401 and attempt == 0:
+                self._token_cache.pop(self.client_id, None)
+                continue
+            if response.status_code == 204:
+                return None
+            response.raise_for_status()
+            return response.json()
+        return None
+
+    def _fetch_range(self, params: dict, first: int, last: int) -> list[dict]:
+        data = self._get("/offres/search", {**params, "range": f"{first}-{last}"})
+        return (data or {}).get("resultats", [])
+
+    def _insee_code(self, postcode: str) -> Optional[str]:
+        # The "commune" filter takes an INSEE code, which differs from the postcode
+        # (75001 is 75101); the API's own referential maps one to the other.
+        with self._insee_lock:
+            if not FranceTravailAPIScraper._insee_loaded:
+                # Loaded once per process even if it fails: an unknown postcode only
+                # falls back to its department.
+                FranceTravailAPIScraper._insee_loaded = True
+                try:
+                    communes = self._get("/referentiel/communes") or []
+                except requests.RequestException as e:
+                    print(f"Warning: Could not load the communes referential: {e}")
+                    communes = []
+                for commune in communes:
+                    code, postal = commune.get("code"), commune.get("codePostal")
+                    if code and postal:
+                        self._insee_codes.setdefault(postal, code)
+            return self._insee_codes.get(postcode)
+
+    def search(self, criteria: SearchCriteria) -> Iterator[JobOffer]:
+        params = self._build_params(criteria)
+        jobs_found = 0
+        seen_ids = set()
+        first = 0
+
+        while jobs_found < criteria.max_results and first < self.MAX_START:
+            last = first + min(criteria.max_results - jobs_found, self.MAX_RANGE) - 1
+            results = self._fetch_range(params, first, last)
+            if not results:
+                break
+
+            for result in results:
+                if jobs_found >= criteria.max_results:
+                    break
+                job = self._parse_result(result)
+                if job and job.id not in seen_ids:
+                    seen_ids.add(job.id)
+                    jobs_found += 1
+                    yield job
+
+            if len(results) < last - first + 1:
+                break
+            first = last + 1
+
+    def _build_params(self, criteria: SearchCriteria) -> dict:
+        params = {"sort": "1"}
+        keywords_parts = list(criteria.keywords)
+        location = (criteria.location or "").strip()
+
+        if re.fullmatch(r"\d{5}", location):
+            insee_code = self._insee_code(location)
+            if insee_code:
+                params["commune"] = insee_code
+                if criteria.radius_km:
+                    params["distance"] = str(criteria.radius_km)
+            else:
+                # Unknown postcode: search its department; search.py trims by radius.
+                params["departement"] = _department_of_postcode(location)
+        elif re.fullmatch(r"\d{2,3}|2[AB]", location, re.IGNORECASE):
+            params["departement"] = location.upper()
+        elif location and location.lower() != "france":
+            keywords_parts.append(location)
+
+        if keywords_parts:
+            params["motsCles"] = ",".join(keywords_parts)
+        return params
+
+    def _parse_result(self, result: dict) -> Optional[JobOffer]:
+        job_id = result.get("id")
+        title = (result.get("intitule") or "").strip()
+        if not job_id or not title:
+            return None
+
+        posted_at = None
+        if created := result.get("dateCreation"):
+            try:
+                posted_at = datetime.fromisoformat(created.replace("Z", "+00:00"))
+            except ValueError:
+                pass
+
+        company = ((result.get("entreprise") or {}).get("nom") or "").strip()
+        location = ((result.get("lieuTravail") or {}).get("libelle") or "").strip()
+
+        return JobOffer(
+            id=f"francetravail_{job_id}",
+            source=self.name,
+            url=f"{self.detail_url}/{job_id}",
+            title=title,
+            company=company or "Entreprise confidentielle",
+            location=location or "France",
+            posted_at=posted_at,
+            snippet=(result.get("description") or "").strip(),
+        )
+
+
+def _department_of_postcode(postcode: str) -> str:
+    if postcode.startswith("97"):
+        return postcode[:3]
+    if postcode.startswith("20"):
+        return "2A" if int(postcode) < 20200 else "2B"
+    return postcode[:2]
+
+
+def create_scraper():
+    if os.getenv("FRANCE_TRAVAIL_CLIENT_ID") and os.getenv("FRANCE_TRAVAIL_CLIENT_SECRET"):
+        return FranceTravailAPIScraper()
+    return FranceTravailScraper()
+
+
 def search_jobs(keywords: list[str], location: str = "France", radius_km: int = None) -> list[str]:
     max_results = int(os.getenv("JOB_SEARCHES", "5"))
-    scraper = FranceTravailScraper()
+    scraper = create_scraper()
     criteria = SearchCriteria(
         keywords=keywords,
         location=location,
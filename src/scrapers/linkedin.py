@@ -43,8 +43,11 @@ class LinkedInScraper:
     DATE_POSTED_MAPPING = {"past_24h": "r86400", "past_week": "r604800", "past_month": "r2592000"}
     RADIUS_MAPPING = {5: "5", 10: "10", 25: "25", 50: "50", 100: "100"}
 
+    GUEST_API_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+
     def __init__(self):
         self.delay = 2
+        self.use_guest_api = os.getenv("LINKEDIN_GUEST_API", "1") != "0"
 
     def _get_headers(self) -> dict:
         return {
@@ -58,18 +61,27 @@ class LinkedInScraper:
         response.raise_for_status()
         return response.text
 
+    def _fetch_cards(self, criteria: SearchCriteria, start: int) -> list:
+        if self.use_guest_api:
+            try:
+                html = self._fetch_page(f"{self._build_search_url(criteria, self.GUEST_API_PATH)}&start={start}")
+                cards = BeautifulSoup(html, "lxml").select("div.base-card")
+                if cards or start > 0:
+                    return cards
+            except requests.RequestException:
+                pass
+            self.use_guest_api = False
+
+        html = self._fetch_page(f"{self._build_search_url(criteria)}&start={start}")
+        return self._extract_job_cards(BeautifulSoup(html, "lxml"))
+
     def search(self, criteria: SearchCriteria) -> Iterator[JobOffer]:
-        url = self._build_search_url(criteria)
         start = 0
         jobs_found = 0
         seen_ids = set()
 
         while jobs_found < criteria.max_results:
-            page_url = f"{url}&start={start}"
-            html = self._fetch_page(page_url)
-            soup = BeautifulSoup(html, "lxml")
-
-            cards = self._extract_job_cards(soup)
+            cards = self._fetch_cards(criteria, start)
             if not cards:
                 break
 
@@ -86,11 +98,11 @@ class LinkedInScraper:
 
             if new_jobs == 0:
                 break
-            start += 25
+            start += len(cards) if self.use_guest_api else 25
             time.sleep(self.delay)
 
-    def _build_search_url(self, criteria: SearchCriteria) -> str:
-        base = f"{self.base_url}/jobs/search"
+    def _build_search_url(self, criteria: SearchCriteria, path: str = "/jobs/search") -> str:
+        base = f"{self.base_url}{path}"
         params = {
             "keywords": " ".join(criteria.keywords),
             "location": criteria.location or "",
@@ -121,9 +133,10 @@ class LinkedInScraper:
                 params["f_TPR"] = code
 
         if criteria.radius_km:
+            # Round up so nothing inside the radius is missed; search.py trims the excess.
             available = sorted(self.RADIUS_MAPPING.keys())
-            closest = min(available, key=lambda x: abs(x - criteria.radius_km))
-            params["distance"] = self.RADIUS_MAPPING[closest]
+            covering = next((r for r in available if r >= criteria.radius_km), available[-1])
+            params["distance"] = self.RADIUS_MAPPING[covering]
 
         return f"{base}?{urlencode(params)}"
 
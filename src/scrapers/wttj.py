@@ -1,7 +1,9 @@
 import os
+import math
 from datetime import datetime
 from typing import Iterator, Optional
 from dataclasses import dataclass, field
+from urllib.parse import urlencode
 
 import requests
 
@@ -49,38 +51,56 @@ class WTTJScraper:
         "freelance": ["freelance"],
     }
 
+    ATTRIBUTES_TO_RETRIEVE = [
+        "reference", "name", "slug", "published_at",
+        "organization.name", "organization.slug",
+        "offices.city", "offices.country",
+    ]
+
     def __init__(self):
-        self.hits_per_page = 20
+        self.max_hits_per_page = 100
+        self.max_pages_per_request = 5
 
     def search(self, criteria: SearchCriteria) -> Iterator[JobOffer]:
         jobs_found = 0
         page = 0
+        nb_pages = None
         seen_ids = set()
 
         query = self._build_query(criteria)
         filters = self._build_filters(criteria)
-
-        while jobs_found < criteria.max_results:
-            results = self._fetch_algolia(query, filters, page)
-            hits = results.get("hits", [])
-            if not hits:
-                break
-
-            for hit in hits:
-                if jobs_found >= criteria.max_results:
+        hits_per_page = max(1, min(criteria.max_results, self.max_hits_per_page))
+
+        while jobs_found < criteria.max_results and (nb_pages is None or page < nb_pages):
+            pages_needed = math.ceil((criteria.max_results - jobs_found) / hits_per_page)
+            batch = range(page, page + min(pages_needed, self.max_pages_per_request))
+            if nb_pages is not None:
+                batch = range(batch.start, min(batch.stop, nb_pages))
+
+            results = self._fetch_algolia([(query, filters, p, hits_per_page) for p in batch])
+            exhausted = False
+            for result in results:
+                nb_pages = result.get("nbPages", 1)
+                hits = result.get("hits", [])
+                if not hits:
+                    exhausted = True
                     break
-                job = self._parse_hit(hit)
-                if job and job.id not in seen_ids:
-                    seen_ids.add(job.id)
-                    jobs_found += 1
-                    yield job
 
-            if page >= results.get("nbPages", 1) - 1:
+                for hit in hits:
+                    if jobs_found >= criteria.max_results:
+                        break
+                    job = self._parse_hit(hit)
+                    if job and job.id not in seen_ids:
+                        seen_ids.add(job.id)
+                        jobs_found += 1
+                        yield job
+
+            if exhausted or not results:
                 break
-            page += 1
+            page = batch.stop
 
-    def _fetch_algolia(self, query: str, filters: str, page: int) -> dict:
-        url = f"https://{self.ALGOLIA_APP_ID.lower()}-dsn.algolia.net/1/indexes/{self.ALGOLIA_INDEX}/query"
+    def _fetch_algolia(self, queries: list[tuple[str, str, int, int]]) -> list[dict]:
+        url = f"https://{self.ALGOLIA_APP_ID.lower()}-dsn.algolia.net/1/indexes/*/queries"
         headers = {
             "X-Algolia-API-Key": self.ALGOLIA_API_KEY,
             "X-Algolia-Application-Id": self.ALGOLIA_APP_ID,
@@ -88,12 +108,23 @@ class WTTJScraper:
             "Referer": "https://www.welcometothejungle.com/",
             "Origin": "https://www.welcometothejungle.com",
         }
-        payload = {"query": query, "hitsPerPage": self.hits_per_page, "page": page}
-        if filters:
-            payload["filters"] = filters
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        requests_payload = []
+        for query, filters, page, hits_per_page in queries:
+            params = {
+                "query": query,
+                "hitsPerPage": hits_per_page,
+                "page": page,
+                "attributesToRetrieve": ",".join(self.ATTRIBUTES_TO_RETRIEVE),
+                "attributesToHighlight": "",
+                "attributesToSnippet": "",
+            }
+            if filters:
+                params["filters"] = filters
+            requests_payload.append({"indexName": self.ALGOLIA_INDEX, "params": urlencode(params)})
+
+        response = requests.post(url, headers=headers, json={"requests": requests_payload}, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return response.json().get("results", [])
 
     def _build_query(self, criteria: SearchCriteria) -> str:
         parts = list(criteria.keywords)
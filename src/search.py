@@ -1,6 +1,10 @@
 import os
+import math
+import sqlite3
+import importlib
 
-from handlers.csv_handler import read_csv_entries, add_csv_entry
+from handlers.csv_handler import read_csv_entries, add_csv_entries, build_url_index
+from handlers.url_utils import url_key
 
 SCRAPERS = {
     "1": ("adzuna", "Adzuna (API, requires ADZUNA_APP_ID/KEY)"),
@@ -11,48 +15,71 @@ SCRAPERS = {
 }
 
 
+def _basic_criteria(SearchCriteria, keywords, location, radius_km, max_results):
+    return SearchCriteria(keywords=keywords, location=location, radius_km=radius_km, max_results=max_results)
+
+
+def _adzuna_criteria(SearchCriteria, keywords, location, radius_km, max_results):
+    country = input("Country code [fr]: ").strip() or "fr"
+    return SearchCriteria(keywords=keywords, location=location, country=country, radius_km=radius_km, max_results=max_results)
+
+
+def _linkedin_criteria(SearchCriteria, keywords, location, radius_km, max_results):
+    contract = input("Contract type (cdi/cdd/stage/alternance, optional): ").strip()
+    workplace = input("Workplace (remote/on_site/hybrid, optional): ").strip()
+    return SearchCriteria(
+        keywords=keywords, location=location, radius_km=radius_km,
+        contract_types=[contract] if contract else [],
+        workplace_types=[workplace] if workplace else [],
+        max_results=max_results
+    )
+
+
+def _wttj_criteria(SearchCriteria, keywords, location, radius_km, max_results):
+    contract = input("Contract type (cdi/cdd/stage/alternance, optional): ").strip()
+    workplace = input("Workplace (remote/on_site, optional): ").strip()
+    return SearchCriteria(
+        keywords=keywords, location=location,
+        contract_types=[contract] if contract else [],
+        workplace_types=[workplace] if workplace else [],
+        max_results=max_results
+    )
+
+
+SCRAPER_REGISTRY = {
+    "adzuna": ("scrapers.adzuna", "AdzunaScraper", _adzuna_criteria),
+    "francetravail": ("scrapers.francetravail", "create_scraper", _basic_criteria),
+    "hellowork": ("scrapers.hellowork", "HelloWorkScraper", _basic_criteria),
+    "linkedin": ("scrapers.linkedin", "LinkedInScraper", _linkedin_criteria),
+    "wttj": ("scrapers.wttj", "WTTJScraper", _wttj_criteria),
+}
+
+
+def load_scraper(scraper_name):
+    module_name, factory_name, build_criteria = SCRAPER_REGISTRY[scraper_name]
+    module = importlib.import_module(module_name)
+    return getattr(module, factory_name), module.SearchCriteria, build_criteria
+
+
 def search_with_scraper(scraper_name, keywords, location, radius_km):
+    if scraper_name not in SCRAPER_REGISTRY:
+        return
     max_results = int(os.getenv("JOB_SEARCHES", "5"))
 
-    if scraper_name == "adzuna":
-        country = input("Country code [fr]: ").strip() or "fr"
-        from scrapers.adzuna import AdzunaScraper, SearchCriteria
-        scraper = AdzunaScraper()
-        criteria = SearchCriteria(keywords=keywords, location=location, country=country, radius_km=radius_km, max_results=max_results)
-    elif scraper_name == "francetravail":
-        from scrapers.francetravail import FranceTravailScraper, SearchCriteria
-        scraper = FranceTravailScraper()
-        criteria = SearchCriteria(keywords=keywords, location=location, radius_km=radius_km, max_results=max_results)
-    elif scraper_name == "hellowork":
-        from scrapers.hellowork import HelloWorkScraper, SearchCriteria
-        scraper = HelloWorkScraper()
-        criteria = SearchCriteria(keywords=keywords, location=location, radius_km=radius_km, max_results=max_results)
-    elif scraper_name == "linkedin":
-        contract = input("Contract type (cdi/cdd/stage/alternance, optional): ").strip()
-        workplace = input("Workplace (remote/on_site/hybrid, optional): ").strip()
-        from scrapers.linkedin import LinkedInScraper, SearchCriteria
-        scraper = LinkedInScraper()
-        criteria = SearchCriteria(
-            keywords=keywords, location=location, radius_km=radius_km,
-            contract_types=[contract] if contract else [],
-            workplace_types=[workplace] if workplace else [],
-            max_results=max_results
-        )
-    elif scraper_name == "wttj":
-        contract = input("Contract type (cdi/cdd/stage/alternance, optional): ").strip()
-        workplace = input("Workplace (remote/on_site, optional): ").strip()
-        from scrapers.wttj import WTTJScraper, SearchCriteria
-        scraper = WTTJScraper()
-        criteria = SearchCriteria(
-            keywords=keywords, location=location,
-            contract_types=[contract] if contract else [],
-            workplace_types=[workplace] if workplace else [],
-            max_results=max_results
-        )
-    else:
-        return
+    factory, SearchCriteria, build_criteria = load_scraper(scraper_name)
+    criteria = build_criteria(SearchCriteria, keywords, location, radius_km, max_results)
+    return factory().search(criteria)
+
 
-    return scraper.search(criteria)
+def offer_to_entry(job) -> dict:
+    return {
+        'url': job.url,
+        'company': job.company or '',
+        'position': job.title or '',
+        'location': job.location or '',
+        'source': job.source or '',
+        'posted_at': job.posted_at.strftime("%Y-%m-%d") if job.posted_at else '',
+    }
 
 
 def prompt_job_search():
@@ -84,21 +111,51 @@ def prompt_job_search():
     print("Searching...\n")
 
     try:
-        jobs = search_with_scraper(scraper_name, keywords, location, radius_km)
-        existing_urls = {e.get('url') for e in read_csv_entries()}
-        added = 0
+        jobs = list(search_with_scraper(scraper_name, keywords, location, radius_km) or [])
 
-        for job in jobs:
-            if job.url in existing_urls:
-                continue
-            
-            print(f"  {job.title} @ {job.company} ({job.location})")
-            add = input("  Add? [Y/n]: ").strip().lower()
-            if add != 'n':
-                add_csv_entry(job.url)
-                existing_urls.add(job.url)
-                added += 1
+        from handlers.offer_history import record_offers
 
+        try:
+            record_offers(jobs, search=f"{job_title} @ {location}")
+        except sqlite3.Error as e:
+            print(f"Warning: Could not save offers to history: {e}")
+        seen_keys = set(build_url_index(read_csv_entries()))
+        fresh = []
+        for job in jobs:
+            key = url_key(job.url)
+            if key and key not in seen_keys:
+                seen_keys.add(key)
+                fresh.append(job)
+
+        if radius_km:
+            from handlers.geo import filter_by_radius
+
+            fresh, too_far = filter_by_radius(fresh, location, radius_km)
+            if too_far:
+                print(f"Skipped {too_far} offer(s) farther than {radius_km} km from {location}")
+
+        from handlers.ranking import get_profile_text, rank_offers
+
+        min_score = float(os.getenv("SEARCH_MIN_SCORE", "0"))
+        ranked = rank_offers(fresh, get_profile_text())
+        accepted = []
+        rejected = 0
+
+        try:
+            for job, score in ranked:
+                if min_score and score < min_score:
+                    rejected += 1
+                    continue
+                relevance = "" if math.isnan(score) else f"[{score:.2f}] "
+                print(f"  {relevance}{job.title} @ {job.company} ({job.location})")
+                add = input("  Add? [Y/n]: ").strip().lower()
+                if add != 'n':
+                    accepted.append(offer_to_entry(job))
+        finally:
+            added = add_csv_entries(accepted) if accepted else 0
+
+        if rejected:
+            print(f"\nSkipped {rejected} offer(s) scoring below {min_score}")
         print(f"\nAdded {added} job(s)")
         return added
     except Exception as e: